@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark the personal_data redaction and hashing paths
+"""
+
+
+import argparse
+import json
+import logging
+import platform
+import random
+import string
+import sys
+import timeit
+from typing import Callable, Dict, List
+
+from encrypt_password import hash_password, is_valid
+from filtered_logger import RedactingFormatter, filter_datum
+
+MESSAGE_SIZES = (16, 256, 4096, 65536)
+FIELD_COUNTS = (1, 5, 20, 50)
+SEPARATORS = (";", "|", ".", "$")
+BCRYPT_ROUNDS = (4, 8, 10, 12)
+
+
+def make_message(size: int, fields: List[str], separator: str,
+                 rng: random.Random) -> str:
+    """Build a key=value message of roughly the given size.
+
+    Args:
+        size (int): Target message length in characters.
+        fields (List[str]): Field names, mixed with non-sensitive ones.
+        separator (str): The separator ending each field-value pair.
+        rng (random.Random): The seeded generator used for values.
+
+    Returns:
+        str: The generated message.
+    """
+    keys = list(fields) + ["ip", "user_agent", "last_login"]
+    pairs = []
+    length = 0
+    while length < size:
+        value = "".join(rng.choice(string.ascii_letters)
+                        for _ in range(rng.randint(3, 12)))
+        pair = "{}={}{}".format(rng.choice(keys), value, separator)
+        pairs.append(pair)
+        length += len(pair)
+    return "".join(pairs)
+
+
+def measure(func: Callable[[], object], repeat: int) -> float:
+    """Time a callable and return its best time per call in seconds.
+
+    Args:
+        func (Callable[[], object]): The code under test.
+        repeat (int): Number of timing runs.
+
+    Returns:
+        float: Seconds per call of the fastest run.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat, number)) / number
+
+
+def redaction_cases(repeat: int) -> Dict[str, float]:
+    """Benchmark filter_datum and RedactingFormatter.format.
+
+    Args:
+        repeat (int): Number of timing runs per case.
+
+    Returns:
+        Dict[str, float]: Seconds per call, keyed by case name.
+    """
+    rng = random.Random(0)
+    results = {}
+    for count in FIELD_COUNTS:
+        fields = ["field{}".format(i) for i in range(count)]
+        for separator in SEPARATORS:
+            for size in MESSAGE_SIZES:
+                message = make_message(size, fields, separator, rng)
+                name = "filter_datum/fields={}/sep={}/size={}".format(
+                    count, separator, size)
+                results[name] = measure(
+                    lambda: filter_datum(fields, "***", message, separator),
+                    repeat)
+    formatter = RedactingFormatter(["name", "email", "phone", "ssn",
+                                    "password"])
+    for size in MESSAGE_SIZES:
+        message = make_message(size, ["name", "email", "phone", "ssn",
+                                      "password"], ";", rng)
+        record = logging.LogRecord("user_data", logging.INFO, None, None,
+                                   message, None, None)
+        results["format/size={}".format(size)] = measure(
+            lambda: formatter.format(record), repeat)
+    return results
+
+
+def hashing_cases(repeat: int) -> Dict[str, float]:
+    """Benchmark hash_password and is_valid at several bcrypt costs.
+
+    Args:
+        repeat (int): Number of timing runs per case.
+
+    Returns:
+        Dict[str, float]: Seconds per call, keyed by case name.
+    """
+    results = {}
+    for rounds in BCRYPT_ROUNDS:
+        hashed = hash_password("benchmark", rounds)
+        results["hash_password/rounds={}".format(rounds)] = measure(
+            lambda: hash_password("benchmark", rounds), repeat)
+        results["is_valid/rounds={}".format(rounds)] = measure(
+            lambda: is_valid(hashed, "benchmark"), repeat)
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float],
+            threshold: float) -> List[str]:
+    """List the cases that got slower than the baseline allows.
+
+    Args:
+        results (Dict[str, float]): The current timings.
+        baseline (Dict[str, float]): The saved timings.
+        threshold (float): Allowed slowdown, e.g. 0.1 for 10%.
+
+    Returns:
+        List[str]: One line per regressed case.
+    """
+    regressions = []
+    for name, seconds in sorted(results.items()):
+        before = baseline.get(name)
+        if before and seconds > before * (1 + threshold):
+            regressions.append("{}: {:.3g}s -> {:.3g}s (+{:.0%})".format(
+                name, before, seconds, seconds / before - 1))
+    return regressions
+
+
+def main() -> None:
+    """Run the suite, save the results and check them against a baseline.
+
+    Exits with status 1 when a case regressed past the threshold.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('--output', help="write results to this JSON file")
+    parser.add_argument('--baseline', help="JSON results to compare with")
+    parser.add_argument('--threshold', type=float, default=0.10)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--skip-bcrypt', action='store_true')
+    args = parser.parse_args()
+
+    results = redaction_cases(args.repeat)
+    if not args.skip_bcrypt:
+        results.update(hashing_cases(args.repeat))
+    report = {"python": platform.python_version(),
+              "machine": platform.machine(),
+              "results": results}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    else:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for line in regressions:
+            print("REGRESSION " + line, file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
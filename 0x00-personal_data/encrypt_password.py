@@ -4,19 +4,43 @@ Encrypting passwords
 """
 
 
+import asyncio
+import atexit
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Tuple
+
 import bcrypt
 
+DEFAULT_ROUNDS = 12
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def default_rounds() -> int:
+    """Get the bcrypt work factor configured for this deployment.
+
+    Returns:
+        int: BCRYPT_ROUNDS from the environment, or DEFAULT_ROUNDS.
+    """
+    return int(os.environ.get('BCRYPT_ROUNDS', DEFAULT_ROUNDS))
 
-def hash_password(password: str) -> bytes:
+
+def hash_password(password: str, rounds: int = None) -> bytes:
     """Hashes a password using bcrypt.
 
     Args:
         password (str): The password to hash.
+        rounds (int): The bcrypt work factor, defaults to default_rounds().
 
     Returns:
         bytes: The hashed password.
     """
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    if rounds is None:
+        rounds = default_rounds()
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds))
 
 
 def is_valid(hashed_password: bytes, password: str) -> bool:
@@ -30,3 +54,162 @@ def is_valid(hashed_password: bytes, password: str) -> bool:
         bool: True if the password is valid, False otherwise.
     """
     return bcrypt.checkpw(password.encode('utf-8'), hashed_password)
+
+
+def hash_rounds(hashed_password: bytes) -> int:
+    """Read the work factor a bcrypt hash was created with.
+
+    Args:
+        hashed_password (bytes): A hash such as b"$2b$12$...".
+
+    Returns:
+        int: The work factor stored in the hash.
+    """
+    return int(hashed_password.split(b"$")[2])
+
+
+def needs_rehash(hashed_password: bytes, rounds: int = None) -> bool:
+    """Check whether a hash uses an outdated work factor.
+
+    Args:
+        hashed_password (bytes): The stored hash.
+        rounds (int): The current work factor, defaults to default_rounds().
+
+    Returns:
+        bool: True if the hash should be recomputed.
+    """
+    if rounds is None:
+        rounds = default_rounds()
+    return hash_rounds(hashed_password) != rounds
+
+
+def verify_password(hashed_password: bytes, password: str,
+                    rounds: int = None) -> Tuple[bool, bool]:
+    """Check a password and report whether its hash is outdated.
+
+    Callers should store hash_password(password) again when the
+    second value is True.
+
+    Args:
+        hashed_password (bytes): The hashed password to compare against.
+        password (str): The password to check for validity.
+        rounds (int): The current work factor, defaults to default_rounds().
+
+    Returns:
+        Tuple[bool, bool]: Whether the password is valid, and whether
+        it is valid but hashed with a different work factor.
+    """
+    valid = is_valid(hashed_password, password)
+    return valid, valid and needs_rehash(hashed_password, rounds)
+
+
+def calibrate_rounds(target_ms: float = 250.0, min_rounds: int = 4,
+                     max_rounds: int = 16) -> int:
+    """Find the largest work factor that hashes within a latency budget.
+
+    Each extra round doubles the cost, so rounds are timed upwards and
+    the search stops at the first one over budget.
+
+    Args:
+        target_ms (float): The hashing time budget in milliseconds.
+        min_rounds (int): The smallest acceptable work factor.
+        max_rounds (int): The largest work factor to try.
+
+    Returns:
+        int: The chosen work factor, never below min_rounds.
+    """
+    best = min_rounds
+    for rounds in range(min_rounds, max_rounds + 1):
+        started = time.perf_counter()
+        bcrypt.hashpw(b"calibration", bcrypt.gensalt(rounds))
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if elapsed_ms > target_ms:
+            break
+        best = rounds
+        if elapsed_ms * 2 > target_ms:
+            break
+    return best
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    """Get the shared process pool used for bcrypt work.
+
+    Creation is guarded by a lock so concurrent first callers share
+    one pool.
+
+    Returns:
+        ProcessPoolExecutor: The pool, created on first use.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ProcessPoolExecutor()
+                atexit.register(_executor.shutdown)
+    return _executor
+
+
+def _is_valid_pair(pair: Tuple[bytes, str]) -> bool:
+    """Check one (hashed_password, password) pair in a worker.
+
+    Args:
+        pair (Tuple[bytes, str]): The hashed password and the candidate.
+
+    Returns:
+        bool: True if the password is valid, False otherwise.
+    """
+    return is_valid(*pair)
+
+
+def hash_passwords(passwords: Iterable[str]) -> List[bytes]:
+    """Hash many passwords across the shared process pool.
+
+    Args:
+        passwords (Iterable[str]): The passwords to hash.
+
+    Returns:
+        List[bytes]: The hashed passwords, in input order.
+    """
+    return list(_get_executor().map(hash_password, passwords))
+
+
+def is_valid_many(pairs: Iterable[Tuple[bytes, str]]) -> List[bool]:
+    """Check many passwords across the shared process pool.
+
+    Args:
+        pairs (Iterable[Tuple[bytes, str]]): (hashed_password, password)
+            pairs to check.
+
+    Returns:
+        List[bool]: Whether each password is valid, in input order.
+    """
+    return list(_get_executor().map(_is_valid_pair, pairs))
+
+
+async def hash_password_async(password: str) -> bytes:
+    """Hash a password in the process pool without blocking the loop.
+
+    Args:
+        password (str): The password to hash.
+
+    Returns:
+        bytes: The hashed password.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), hash_password,
+                                      password)
+
+
+async def is_valid_async(hashed_password: bytes, password: str) -> bool:
+    """Check a password in the process pool without blocking the loop.
+
+    Args:
+        hashed_password (bytes): The hashed password to compare against.
+        password (str): The password to check for validity.
+
+    Returns:
+        bool: True if the password is valid, False otherwise.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), is_valid,
+                                      hashed_password, password)
@@ -4,14 +4,96 @@ a function called filter_datum that returns the log message obfuscated
 """
 
 
+import atexit
+import copy
 import logging
+import logging.handlers
 import os
+import queue
 import re
-from typing import List
+import sys
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import (FrozenSet, Iterator, List, Pattern, Sequence, TextIO,
+                    Tuple, Union)
 import mysql.connector
+import mysql.connector.pooling
 
 PII_FIELDS = ("name", "email", "phone", "ssn", "password")
+USER_COLUMNS = ("name", "email", "phone", "ssn", "password", "ip",
+                "last_login", "user_agent")
 
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_OLDEST = "drop-oldest"
+OVERFLOW_DROP_NEWEST = "drop-newest"
+_listeners = []
+_pool = None
+_pool_lock = threading.Lock()
+
+
+@lru_cache(maxsize=128)
+def _redaction_pattern(fields: Tuple[str, ...],
+                       separator: str) -> Pattern[str]:
+    """Compile a single alternation matching every field value.
+
+    Args:
+        fields (Tuple[str, ...]): The field names to be filtered.
+        separator (str): The separator ending each field-value pair.
+
+    Returns:
+        Pattern[str]: The compiled pattern, cached per fields/separator.
+    """
+    alternation = "|".join(re.escape(f) for f in fields)
+    return re.compile(rf"({alternation})=.*?{re.escape(separator)}")
+
+
+def _escape_template(text: str) -> str:
+    """Escape a literal string for use as an ``re.sub`` template.
+
+    Args:
+        text (str): The literal replacement text.
+
+    Returns:
+        str: The text with backslashes escaped.
+    """
+    return text.replace("\\", r"\\")
+
+
+class Redactor:
+    """Reusable compiled redactor for a fixed set of fields.
+
+    All fields are matched by one alternation pattern so a message is
+    rewritten in a single scan instead of one scan per field.
+    """
+
+    def __init__(self, fields: List[str], redaction: str, separator: str):
+        """Initialize the Redactor.
+
+        Args:
+            fields (List[str]): A list of field names to be filtered.
+            redaction (str): The string used to replace field values.
+            separator (str): The separator used to identify
+                field-value pairs.
+        """
+        self.fields = tuple(fields)
+        self.redaction = redaction
+        self.separator = separator
+        self._pattern = _redaction_pattern(self.fields, separator)
+        self._replacement = r"\1=" + _escape_template(redaction + separator)
+
+    def __call__(self, message: str) -> str:
+        """Redact the configured fields in a message.
+
+        Args:
+            message (str): The message containing the fields to be filtered.
+
+        Returns:
+            str: The message with every configured field value redacted.
+        """
+        if not self.fields:
+            return message
+        return self._pattern.sub(self._replacement, message)
 
 
 def filter_datum(fields: List[str], redaction: str, message: str,
@@ -28,10 +110,7 @@ def filter_datum(fields: List[str], redaction: str, message: str,
     Returns:
         str: The filtered message with sensitive fields redacted.
     """
-    for f in fields:
-        message = re.sub(rf"{f}=(.*?)\{separator}",
-                         f'{f}={redaction}{separator}', message)
-    return message
+    return Redactor(fields, redaction, separator)(message)
 
 
 class RedactingFormatter(logging.Formatter):
@@ -54,6 +133,7 @@ class RedactingFormatter(logging.Formatter):
             fields (List[str]): A list of field names to be redacted.
         """
         self.fields = fields
+        self.redactor = Redactor(fields, self.REDACTION, self.SEPARATOR)
         super(RedactingFormatter, self).__init__(self.FORMAT)
 
     def format(self, record: logging.LogRecord) -> str:
@@ -65,13 +145,138 @@ class RedactingFormatter(logging.Formatter):
         Returns:
             str: The formatted log message with sensitive information redacted.
         """
-        return filter_datum(self.fields, self.REDACTION,
-                            super().format(record), self.SEPARATOR)
+        return self.redactor(super().format(record))
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that applies an overflow policy to a bounded queue.
+
+    Only the record's message arguments are merged on the caller's
+    thread; formatting, redaction and I/O are left to the listener.
+    """
+
+    def __init__(self, log_queue: queue.Queue,
+                 overflow: str = OVERFLOW_BLOCK):
+        """Initialize the BoundedQueueHandler.
+
+        Args:
+            log_queue (queue.Queue): The bounded queue records are put on.
+            overflow (str): One of OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST
+                or OVERFLOW_DROP_NEWEST.
+        """
+        if overflow not in (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST,
+                            OVERFLOW_DROP_NEWEST):
+            raise ValueError("unknown overflow policy: {}".format(overflow))
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Snapshot the record message so it can be formatted later.
+
+        Args:
+            record (logging.LogRecord): The record being enqueued.
+
+        Returns:
+            logging.LogRecord: The record with its arguments merged.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Put the record on the queue according to the overflow policy.
+
+        Args:
+            record (logging.LogRecord): The prepared record.
+        """
+        if self.overflow == OVERFLOW_BLOCK:
+            self.queue.put(record)
+            return
+        while True:
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                if self.overflow == OVERFLOW_DROP_NEWEST:
+                    self.dropped += 1
+                    return
+            try:
+                self.queue.get_nowait()
+                self.dropped += 1
+            except queue.Empty:
+                pass
+
+
+class FlushingQueueListener(logging.handlers.QueueListener):
+    """Queue listener whose stop() always drains pending records."""
+
+    def enqueue_sentinel(self) -> None:
+        """Block until the stop sentinel fits behind pending records."""
+        self.queue.put(self._sentinel)
+
+
+def _stop_listeners() -> None:
+    """Stop every background listener, flushing pending records."""
+    while _listeners:
+        _listeners.pop().stop()
+
+
+atexit.register(_stop_listeners)
 
 
-def get_logger() -> logging.Logger:
+@lru_cache(maxsize=128)
+def _pii_positions(columns: Tuple[str, ...],
+                   fields: Tuple[Union[str, int], ...]) -> FrozenSet[int]:
+    """Resolve field names and positions to the column indexes to mask.
+
+    Args:
+        columns (Tuple[str, ...]): The column names of the row.
+        fields (Tuple[Union[str, int], ...]): Column names or positions.
+
+    Returns:
+        FrozenSet[int]: The indexes of the columns to be redacted.
+    """
+    return frozenset(i for i, column in enumerate(columns)
+                     if column in fields or i in fields)
+
+
+def redact_row(row: Sequence, columns: Sequence[str] = USER_COLUMNS,
+               fields: Sequence[Union[str, int]] = PII_FIELDS,
+               redaction: str = RedactingFormatter.REDACTION) -> Tuple:
+    """Mask the sensitive values of a row before it is formatted.
+
+    Unlike filter_datum, no message is parsed: values are replaced by
+    column name or position, so this is the path for structured rows
+    while filter_datum remains the fallback for free-form messages.
+
+    Args:
+        row (Sequence): The row values.
+        columns (Sequence[str]): The column names, in row order.
+        fields (Sequence[Union[str, int]]): Column names or positions
+            to be redacted.
+        redaction (str): The string used to replace sensitive values.
+
+    Returns:
+        Tuple: The row with sensitive values replaced.
+    """
+    positions = _pii_positions(tuple(columns), tuple(fields))
+    return tuple(redaction if i in positions else value
+                 for i, value in enumerate(row))
+
+
+def get_logger(asynchronous: bool = False, queue_size: int = 10000,
+               overflow: str = OVERFLOW_BLOCK) -> logging.Logger:
     """Get a configured logger instance for user data logging.
 
+    Args:
+        asynchronous (bool): Hand records to a background thread through
+            a bounded queue instead of formatting them on the caller.
+        queue_size (int): Maximum number of pending records.
+        overflow (str): What to do when the queue is full: block the
+            caller, drop the oldest pending record or drop the new one.
+
     Returns:
         logging.Logger: A logger instance for user data logging.
     """
@@ -80,10 +285,30 @@ def get_logger() -> logging.Logger:
     logger.propagate = False
     handler = logging.StreamHandler()
     handler.setFormatter(RedactingFormatter(PII_FIELDS))
+    if asynchronous:
+        log_queue = queue.Queue(maxsize=queue_size)
+        listener = FlushingQueueListener(log_queue, handler)
+        listener.start()
+        _listeners.append(listener)
+        handler = BoundedQueueHandler(log_queue, overflow)
     logger.addHandler(handler)
     return logger
 
 
+def _db_config() -> dict:
+    """Read the database settings from the environment.
+
+    Returns:
+        dict: Connection keyword arguments for mysql.connector.
+    """
+    return {
+        "host": os.environ.get('PERSONAL_DATA_DB_HOST', 'localhost'),
+        "database": os.environ.get('PERSONAL_DATA_DB_NAME'),
+        "user": os.environ.get('PERSONAL_DATA_DB_USERNAME', "root"),
+        "password": os.environ.get("PERSONAL_DATA_DB_PASSWORD", ""),
+    }
+
+
 def get_db() -> mysql.connector.connection.MySQLConnection:
     """Get a connection to the personal data database.
 
@@ -91,17 +316,131 @@ def get_db() -> mysql.connector.connection.MySQLConnection:
         mysql.connector.connection.MySQLConnection
         : A connection to the personal data database.
     """
-    password = os.environ.get("PERSONAL_DATA_DB_PASSWORD", "")
-    username = os.environ.get('PERSONAL_DATA_DB_USERNAME', "root")
-    host = os.environ.get('PERSONAL_DATA_DB_HOST', 'localhost')
-    db_name = os.environ.get('PERSONAL_DATA_DB_NAME')
-    conn = mysql.connector.connect(
-        host=host,
-        database=db_name,
-        user=username,
-        password=password)
-    return conn
+    return mysql.connector.connect(**_db_config())
+
+
+def get_db_pool() -> mysql.connector.pooling.MySQLConnectionPool:
+    """Get the shared connection pool for the personal data database.
 
+    The pool is created on first use from the PERSONAL_DATA_DB_*
+    variables; PERSONAL_DATA_DB_POOL_SIZE sets its size (default 5).
+    All its connections are opened up front, so it is meant for
+    long-lived callers; one-shot scripts should use get_db().
+    Creation is guarded by a lock so concurrent first callers share
+    one pool.
+
+    Returns:
+        mysql.connector.pooling.MySQLConnectionPool: The shared pool.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                pool_size = int(os.environ.get('PERSONAL_DATA_DB_POOL_SIZE',
+                                               5))
+                _pool = mysql.connector.pooling.MySQLConnectionPool(
+                    pool_name="personal_data", pool_size=pool_size,
+                    **_db_config())
+    return _pool
+
+
+@contextmanager
+def pooled_db() -> Iterator[mysql.connector.pooling.PooledMySQLConnection]:
+    """Check a healthy connection out of the pool for a with block.
+
+    The connection is pinged on checkout and reconnected if the server
+    dropped it, and it goes back to the pool when the block exits.
+
+    Yields:
+        mysql.connector.pooling.PooledMySQLConnection: A live connection.
+    """
+    conn = get_db_pool().get_connection()
+    try:
+        conn.ping(reconnect=True, attempts=3, delay=0)
+        yield conn
+    finally:
+        conn.close()
+
+
+def format_row(row: Tuple) -> str:
+    """Format a users row as a key=value; message.
+
+    Args:
+        row (Tuple): A row of the 'users' table.
+
+    Returns:
+        str: The formatted message.
+    """
+    return f"name={row[0]}; email={row[1]}; phone={row[2]}; " +\
+        f"ssn={row[3]}; password={row[4]};ip={row[5]}; " +\
+        f"last_login={row[6]}; user_agent={row[7]};"
+
+
+def masked_select(columns: Sequence[str] = USER_COLUMNS,
+                  fields: Sequence[str] = PII_FIELDS,
+                  table: str = "users") -> Tuple[str, Tuple[str, ...]]:
+    """Build a SELECT that masks sensitive columns on the server.
+
+    Each column in fields is selected as a constant redaction string, so
+    only non-sensitive values are transferred and raw PII never reaches
+    the process.
+
+    Args:
+        columns (Sequence[str]): The columns to select, in order.
+        fields (Sequence[str]): The columns to be redacted.
+        table (str): The table to select from.
+
+    Returns:
+        Tuple[str, Tuple[str, ...]]: The query and its parameters.
+    """
+    select = []
+    params = []
+    for column in columns:
+        if column in fields:
+            select.append("%s AS `{}`".format(column))
+            params.append(RedactingFormatter.REDACTION)
+        else:
+            select.append("`{}`".format(column))
+    query = "SELECT {} FROM `{}`;".format(", ".join(select), table)
+    return query, tuple(params)
+
+
+def export_users(db: mysql.connector.connection.MySQLConnection,
+                 batch_size: int = 1000, out: TextIO = None,
+                 mask_in_sql: bool = False) -> None:
+    """Stream the 'users' table to a file in redacted batches.
+
+    Rows are pulled through an unbuffered cursor with fetchmany so memory
+    stays flat. Sensitive columns are masked with redact_row before the
+    rows are formatted, and each batch is written with one write.
+
+    Args:
+        db (mysql.connector.connection.MySQLConnection): The connection.
+        batch_size (int): Number of rows fetched and written at once.
+        out (TextIO): Where to write, defaults to sys.stdout.
+        mask_in_sql (bool): Let the server mask sensitive columns with
+            masked_select instead of masking them in Python.
+    """
+    if out is None:
+        out = sys.stdout
+    cursor = db.cursor(buffered=False)
+    try:
+        if mask_in_sql:
+            cursor.execute(*masked_select())
+            columns, fields = USER_COLUMNS, ()
+        else:
+            cursor.execute("SELECT * FROM users;")
+            columns, fields = cursor.column_names or USER_COLUMNS, PII_FIELDS
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            if fields:
+                rows = [redact_row(row, columns, fields) for row in rows]
+            out.write("".join(format_row(row) + "\n" for row in rows))
+    finally:
+        cursor.close()
+    out.flush()
 
 
 def main() -> None:
@@ -110,21 +449,28 @@ def main() -> None:
     This function connects to the database, retrieves
     user data from the 'users' table,
     and prints the data in a formatted message.
+    When PERSONAL_DATA_EXPORT_BATCH_SIZE is set, rows are
+    streamed and redacted in batches of that size instead, and
+    PERSONAL_DATA_EXPORT_MASK_SQL moves the masking into the query.
 
     Returns:
         None
     """
+    batch_size = os.environ.get('PERSONAL_DATA_EXPORT_BATCH_SIZE')
+    mask_in_sql = bool(os.environ.get('PERSONAL_DATA_EXPORT_MASK_SQL'))
     db = get_db()
-    cursor = db.cursor()
-    cursor.execute("SELECT * FROM users;")
-    for row in cursor:
-        message = f"name={row[0]}; email={row[1]}; phone={row[2]}; " +\
-            f"ssn={row[3]}; password={row[4]};ip={row[5]}; " +\
-            f"last_login={row[6]}; user_agent={row[7]};"
-        print(message)
-    cursor.close()
-    db.close()
+    try:
+        if batch_size:
+            export_users(db, int(batch_size), mask_in_sql=mask_in_sql)
+            return
+        cursor = db.cursor()
+        cursor.execute("SELECT * FROM users;")
+        for row in cursor:
+            print(format_row(row))
+        cursor.close()
+    finally:
+        db.close()
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Retroactively redact PII in large log files using a process pool
+"""
+
+
+import argparse
+import mmap
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Tuple
+
+from filtered_logger import PII_FIELDS, RedactingFormatter, filter_datum
+
+
+def line_chunks(path: str, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    """Split a file into line-aligned byte ranges.
+
+    Args:
+        path (str): The file to split.
+        chunk_size (int): Approximate size of each range in bytes.
+
+    Yields:
+        Tuple[int, int]: The start and end offsets of each range.
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return
+    with open(path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            end = mm.find(b"\n", min(start + chunk_size, size) - 1) + 1
+            if end == 0:
+                end = size
+            yield start, end
+            start = end
+
+
+def redact_chunk(path: str, start: int, end: int, fields: List[str],
+                 redaction: str, separator: str) -> bytes:
+    """Redact one byte range of a file.
+
+    Args:
+        path (str): The file to read from.
+        start (int): Offset of the first byte of the range.
+        end (int): Offset just past the last byte of the range.
+        fields (List[str]): A list of field names to be filtered.
+        redaction (str): The string used to replace field values.
+        separator (str): The separator used to identify field-value pairs.
+
+    Returns:
+        bytes: The redacted range.
+    """
+    with open(path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = mm[start:end].decode('utf-8', 'surrogateescape')
+    return filter_datum(fields, redaction, text,
+                        separator).encode('utf-8', 'surrogateescape')
+
+
+def redact_file(src: str, dst: str, fields: List[str], redaction: str,
+                separator: str, workers: int = None,
+                chunk_size: int = 8 << 20) -> int:
+    """Redact a file chunk by chunk in a process pool, keeping line order.
+
+    At most two chunks per worker are in flight at any time so memory
+    stays bounded regardless of the input size.
+
+    Args:
+        src (str): The log file to redact.
+        dst (str): Where to write the redacted copy.
+        fields (List[str]): A list of field names to be filtered.
+        redaction (str): The string used to replace field values.
+        separator (str): The separator used to identify field-value pairs.
+        workers (int): Number of worker processes, defaults to CPU count.
+        chunk_size (int): Approximate size of each chunk in bytes.
+
+    Returns:
+        int: Number of bytes read from src.
+    """
+    workers = workers or os.cpu_count() or 1
+    total = 0
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool, \
+            open(dst, 'wb') as out:
+        for start, end in line_chunks(src, chunk_size):
+            if len(pending) >= 2 * workers:
+                out.write(pending.popleft().result())
+            pending.append(pool.submit(redact_chunk, src, start, end,
+                                       fields, redaction, separator))
+            total += end - start
+        while pending:
+            out.write(pending.popleft().result())
+    return total
+
+
+def main() -> None:
+    """Parse the command line and redact the requested file."""
+    parser = argparse.ArgumentParser(description=__doc__.strip())
+    parser.add_argument('src', help="log file to redact")
+    parser.add_argument('dst', help="where to write the redacted copy")
+    parser.add_argument('--fields', nargs='+', default=list(PII_FIELDS))
+    parser.add_argument('--redaction', default=RedactingFormatter.REDACTION)
+    parser.add_argument('--separator', default=RedactingFormatter.SEPARATOR)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-mb', type=int, default=8)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    total = redact_file(args.src, args.dst, args.fields, args.redaction,
+                        args.separator, args.workers, args.chunk_mb << 20)
+    elapsed = time.perf_counter() - started
+    mb = total / (1 << 20)
+    print("redacted {:.1f} MB in {:.2f}s ({:.1f} MB/s)".format(
+        mb, elapsed, mb / elapsed if elapsed else 0.0), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests of the shared bcrypt process pool, against a fake bcrypt module
+"""
+
+
+import importlib
+import os
+import sys
+import threading
+import time
+import types
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+class FakeExecutor:
+    """A process pool that records how many were built."""
+
+    created = []
+
+    def __init__(self):
+        """Record the pool; slow, to widen creation races."""
+        time.sleep(0.05)
+        FakeExecutor.created.append(self)
+
+    def shutdown(self):
+        """Nothing to stop."""
+
+
+class TestGetExecutor(unittest.TestCase):
+    """_get_executor against the fake pool."""
+
+    def setUp(self):
+        """Import a fresh encrypt_password bound to a fake bcrypt."""
+        FakeExecutor.created = []
+        patcher = mock.patch.dict(sys.modules,
+                                  {'bcrypt': types.ModuleType('bcrypt')})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        sys.modules.pop('encrypt_password', None)
+        self.module = importlib.import_module('encrypt_password')
+        self.addCleanup(sys.modules.pop, 'encrypt_password', None)
+        patcher = mock.patch.object(self.module, 'ProcessPoolExecutor',
+                                    FakeExecutor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_executor_is_shared(self):
+        """Later calls reuse the pool."""
+        self.assertIs(self.module._get_executor(),
+                      self.module._get_executor())
+        self.assertEqual(len(FakeExecutor.created), 1)
+
+    def test_concurrent_first_callers_share_one_executor(self):
+        """Threads racing on the first call build a single pool."""
+        executors = []
+        threads = [threading.Thread(
+            target=lambda: executors.append(self.module._get_executor()))
+            for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(FakeExecutor.created), 1)
+        self.assertTrue(all(executor is executors[0]
+                            for executor in executors))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Tests of the pooled database connections, against a fake
+mysql.connector.pooling that stands in for a local server
+"""
+
+
+import importlib
+import os
+import sys
+import threading
+import time
+import types
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+
+class FakeInterfaceError(Exception):
+    """Stands in for mysql.connector.errors.InterfaceError."""
+
+
+class FakeConnection:
+    """A pooled connection that records pings and returns to its pool."""
+
+    def __init__(self, pool):
+        """Initialize a connection checked out of pool."""
+        self.pool = pool
+        self.pings = []
+        self.reconnects = 0
+
+    def ping(self, reconnect=False, attempts=1, delay=0):
+        """Record the ping arguments, reconnecting a dropped connection.
+
+        The pool's `down` attempts fail, like a server that is back
+        after that many reconnects.
+        """
+        self.pings.append((reconnect, attempts, delay))
+        if not self.pool.down:
+            return
+        if not reconnect or self.pool.down >= attempts:
+            self.pool.down = max(self.pool.down - attempts, 0)
+            raise FakeInterfaceError("Can not reconnect to MySQL")
+        self.reconnects = self.pool.down
+        self.pool.down = 0
+
+    def close(self):
+        """Give the connection back to the pool."""
+        self.pool.returned.append(self)
+
+
+class FakePool:
+    """A connection pool that records how it was built and used."""
+
+    created = []
+
+    def __init__(self, pool_name=None, pool_size=5, **config):
+        """Record the pool settings; slow, to widen creation races."""
+        time.sleep(0.05)
+        self.pool_name = pool_name
+        self.pool_size = pool_size
+        self.config = config
+        self.returned = []
+        self.down = 0
+        FakePool.created.append(self)
+
+    def get_connection(self):
+        """Check out a new fake connection."""
+        return FakeConnection(self)
+
+
+def fake_mysql() -> dict:
+    """Build the fake mysql.connector modules.
+
+    Returns:
+        dict: The modules to install in sys.modules.
+    """
+    mysql = types.ModuleType('mysql')
+    connector = types.ModuleType('mysql.connector')
+    connection = types.ModuleType('mysql.connector.connection')
+    pooling = types.ModuleType('mysql.connector.pooling')
+    errors = types.ModuleType('mysql.connector.errors')
+    errors.InterfaceError = FakeInterfaceError
+    connection.MySQLConnection = object
+    pooling.MySQLConnectionPool = FakePool
+    pooling.PooledMySQLConnection = FakeConnection
+    connector.connection = connection
+    connector.pooling = pooling
+    connector.errors = errors
+    connector.connect = mock.Mock()
+    mysql.connector = connector
+    return {'mysql': mysql, 'mysql.connector': connector,
+            'mysql.connector.connection': connection,
+            'mysql.connector.pooling': pooling,
+            'mysql.connector.errors': errors}
+
+
+class TestPooledDb(unittest.TestCase):
+    """get_db_pool and pooled_db against the fake pool."""
+
+    def setUp(self):
+        """Import a fresh filtered_logger bound to the fake modules."""
+        FakePool.created = []
+        patcher = mock.patch.dict(sys.modules, fake_mysql())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        sys.modules.pop('filtered_logger', None)
+        self.module = importlib.import_module('filtered_logger')
+        self.addCleanup(sys.modules.pop, 'filtered_logger', None)
+
+    def test_pool_size_from_environment(self):
+        """PERSONAL_DATA_DB_POOL_SIZE sets the pool size."""
+        with mock.patch.dict(os.environ, {'PERSONAL_DATA_DB_POOL_SIZE': '3',
+                                          'PERSONAL_DATA_DB_NAME': 'db'}):
+            pool = self.module.get_db_pool()
+        self.assertEqual(pool.pool_size, 3)
+        self.assertEqual(pool.pool_name, "personal_data")
+        self.assertEqual(pool.config['database'], 'db')
+
+    def test_default_pool_size(self):
+        """The pool has 5 connections by default."""
+        with mock.patch.dict(os.environ):
+            os.environ.pop('PERSONAL_DATA_DB_POOL_SIZE', None)
+            self.assertEqual(self.module.get_db_pool().pool_size, 5)
+
+    def test_pool_is_shared(self):
+        """Later calls reuse the pool."""
+        self.assertIs(self.module.get_db_pool(), self.module.get_db_pool())
+        self.assertEqual(len(FakePool.created), 1)
+
+    def test_concurrent_first_callers_share_one_pool(self):
+        """Threads racing on the first call build a single pool."""
+        pools = []
+        threads = [threading.Thread(
+            target=lambda: pools.append(self.module.get_db_pool()))
+            for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(FakePool.created), 1)
+        self.assertTrue(all(pool is pools[0] for pool in pools))
+
+    def test_checkout_pings_with_reconnect(self):
+        """A checked out connection is pinged with reconnect."""
+        with self.module.pooled_db() as conn:
+            self.assertEqual(conn.pings, [(True, 3, 0)])
+
+    def test_checkout_reconnects_dropped_connection(self):
+        """A connection dropped by the server is reconnected on checkout."""
+        self.module.get_db_pool().down = 2
+        with self.module.pooled_db() as conn:
+            self.assertEqual(conn.reconnects, 2)
+        self.assertEqual(self.module.get_db_pool().returned, [conn])
+
+    def test_checkout_raises_when_server_is_gone(self):
+        """A failed reconnect raises and still returns the connection."""
+        pool = self.module.get_db_pool()
+        pool.down = 10
+        with self.assertRaises(FakeInterfaceError):
+            with self.module.pooled_db():
+                self.fail("the block must not run")
+        self.assertEqual(len(pool.returned), 1)
+
+    def test_main_uses_a_single_connection(self):
+        """The one-shot export opens one connection and no pool."""
+        connect = sys.modules['mysql.connector'].connect
+        db = connect.return_value
+        db.cursor.return_value.__iter__ = mock.Mock(return_value=iter([]))
+        with mock.patch.dict(os.environ):
+            os.environ.pop('PERSONAL_DATA_EXPORT_BATCH_SIZE', None)
+            self.module.main()
+        connect.assert_called_once()
+        db.close.assert_called_once()
+        self.assertEqual(FakePool.created, [])
+
+    def test_connection_returns_to_pool(self):
+        """The connection goes back to the pool after the block."""
+        with self.module.pooled_db() as conn:
+            pass
+        self.assertEqual(self.module.get_db_pool().returned, [conn])
+
+    def test_connection_returns_to_pool_on_error(self):
+        """The connection goes back to the pool when the block raises."""
+        with self.assertRaises(RuntimeError):
+            with self.module.pooled_db() as conn:
+                raise RuntimeError("query failed")
+        self.assertEqual(self.module.get_db_pool().returned, [conn])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+""" Bounded object cache module
+"""
+import threading
+from collections import OrderedDict
+from os import getenv
+from typing import Any, Hashable, List
+
+CACHE_SIZE = int(getenv('MODEL_CACHE_SIZE', 10000))
+_MISSING = object()
+
+
+class LRUCache():
+    """ Mapping of at most `max_size` entries
+
+    Reads move an entry to the most recently used end, and inserting
+    past the limit evicts the least recently used entries. Every
+    operation takes an internal lock, since reads reorder the entries.
+    """
+
+    def __init__(self, max_size: int = CACHE_SIZE):
+        """ Initialize an empty LRUCache
+        """
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """ Value of `key`, marked as recently used, or `default`
+        """
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def __setitem__(self, key: Hashable, value: Any):
+        """ Insert or replace an entry, evicting the coldest ones
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+
+    def setdefault(self, key: Hashable, value: Any) -> Any:
+        """ Value of `key`, inserting `value` first if it is absent
+        """
+        with self._lock:
+            current = self._data.get(key, _MISSING)
+            if current is not _MISSING:
+                self._data.move_to_end(key)
+                return current
+            self._data[key] = value
+            self._evict()
+            return value
+
+    def _evict(self):
+        """ Drop least recently used entries beyond max_size
+        """
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """ Remove an entry and return its value, or `default`
+        """
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        """ Remove every entry
+        """
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        """ Whether `key` is cached, without marking it as used
+        """
+        return key in self._data
+
+    def __len__(self) -> int:
+        """ Number of cached entries
+        """
+        return len(self._data)
+
+    def keys(self) -> List[Hashable]:
+        """ Snapshot of the cached keys, coldest first
+        """
+        with self._lock:
+            return list(self._data.keys())
+
+    def values(self) -> List[Any]:
+        """ Snapshot of the cached values, coldest first
+        """
+        with self._lock:
+            return list(self._data.values())
+
+    def items(self) -> List[tuple]:
+        """ Snapshot of the cached entries, coldest first
+        """
+        with self._lock:
+            return list(self._data.items())
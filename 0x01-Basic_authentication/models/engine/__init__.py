@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+""" Storage engines of the models
+
+MODEL_STORAGE selects the engine: 'journal', 'sqlite', or the JSON
+FileStorage by default. MODEL_WRITE_BEHIND buffers the writes of the
+file-based engines. With 'sqlite', objects are read on demand and at
+most MODEL_CACHE_SIZE objects per class are kept in memory.
+"""
+from os import getenv
+
+from models.engine.file_storage import FileStorage
+from models.engine.journal_storage import JournalStorage
+from models.engine.sqlite_storage import SQLiteStorage
+from models.engine.write_behind_storage import WriteBehindStorage
+
+if getenv('MODEL_STORAGE') == 'journal':
+    storage = JournalStorage()
+elif getenv('MODEL_STORAGE') == 'sqlite':
+    storage = SQLiteStorage()
+else:
+    storage = FileStorage()
+
+if getenv('MODEL_WRITE_BEHIND') and not storage.queryable:
+    storage = WriteBehindStorage(storage)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+""" Write-behind storage module
+"""
+import atexit
+import logging
+import threading
+from os import getenv
+
+FLUSH_INTERVAL = float(getenv('MODEL_FLUSH_INTERVAL', 1.0))
+FLUSH_THRESHOLD = int(getenv('MODEL_FLUSH_THRESHOLD', 100))
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindStorage():
+    """ Buffer mutations and hand them to another storage in groups
+
+    save() and remove() only mark the object dirty. A background thread
+    flushes every `interval` seconds, or as soon as `threshold` objects
+    are dirty, so many writes share one disk write. Repeated writes of
+    the same object between two flushes are written once. Pending
+    writes are also flushed by flush(), before a load and at exit.
+    Mutations whose write failed stay pending until a later flush
+    writes them, unless a newer mutation of the object replaced them.
+    """
+    queryable = False
+
+    def __init__(self, storage, interval: float = FLUSH_INTERVAL,
+                 threshold: int = FLUSH_THRESHOLD):
+        """ Initialize a WriteBehindStorage around `storage`
+        """
+        self.storage = storage
+        self.interval = interval
+        self.threshold = threshold
+        self._pending = {}
+        self._objs = {}
+        self._dirty = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._flusher = threading.Thread(target=self._run, daemon=True)
+        self._flusher.start()
+        atexit.register(self.flush)
+
+    def register(self, s_class: str, indexed_attributes: tuple):
+        """ Declare a class to the underlying storage
+        """
+        self.storage.register(s_class, indexed_attributes)
+
+    def load(self, s_class: str) -> dict:
+        """ Return the serialized objects of a class, keyed by ID
+        """
+        self.flush()
+        return self.storage.load(s_class)
+
+    def iter_load(self, s_class: str):
+        """ Yield the (ID, serialized object) pairs of a class
+        """
+        self.flush()
+        return self.storage.iter_load(s_class)
+
+    def changes(self, s_class: str):
+        """ Objects changed by other processes since the last load
+
+        Pending writes are only flushed when the whole class must be
+        loaded again. Changes of objects with a pending write are left
+        out, since that write will replace them.
+        """
+        changes = self.storage.changes(s_class)
+        if changes is None:
+            self.flush()
+            return None
+        with self._lock:
+            pending = self._pending.get(s_class, {})
+            return [(obj_id, obj_json) for obj_id, obj_json in changes
+                    if obj_id not in pending]
+
+    def dump(self, s_class: str, objs_json: dict):
+        """ Replace the stored objects of a class, dropping pending writes
+        """
+        with self._flush_lock:
+            with self._lock:
+                self._dirty -= len(self._pending.pop(s_class, {}))
+            self.storage.dump(s_class, objs_json)
+
+    def save(self, s_class: str, obj, objs: dict):
+        """ Mark a created or updated object dirty
+        """
+        self._mark(s_class, 'save', obj, objs)
+
+    def remove(self, s_class: str, obj, objs: dict):
+        """ Mark a removed object dirty
+        """
+        self._mark(s_class, 'remove', obj, objs)
+
+    def write_batch(self, s_class: str, ops: list, objs: dict):
+        """ Mark a list of ('save' | 'remove', obj) mutations dirty
+        """
+        for op, obj in ops:
+            self._mark(s_class, op, obj, objs)
+
+    def _mark(self, s_class: str, op: str, obj, objs: dict):
+        """ Record the latest mutation of an object
+        """
+        with self._lock:
+            pending = self._pending.setdefault(s_class, {})
+            if obj.id not in pending:
+                self._dirty += 1
+            pending[obj.id] = (op, obj)
+            self._objs[s_class] = objs
+            if self._dirty >= self.threshold:
+                self._wake.set()
+
+    def flush(self):
+        """ Write every pending mutation now
+
+        If a write fails, the mutations of that class and of the classes
+        not written yet are pending again, and the error is raised.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._dirty = 0
+            classes = list(pending)
+            for i, s_class in enumerate(classes):
+                try:
+                    self.storage.write_batch(
+                        s_class, list(pending[s_class].values()),
+                        self._objs[s_class])
+                except BaseException:
+                    for failed in classes[i:]:
+                        self._requeue(failed, pending[failed])
+                    raise
+
+    def _requeue(self, s_class: str, ops: dict):
+        """ Mark failed mutations dirty again, keeping newer ones
+        """
+        with self._lock:
+            pending = self._pending.setdefault(s_class, {})
+            for obj_id, op in ops.items():
+                if obj_id not in pending:
+                    pending[obj_id] = op
+                    self._dirty += 1
+
+    def _run(self):
+        """ Flush on every interval or when woken by the threshold
+
+        A failed flush is logged and retried on the next interval.
+        """
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("write-behind flush failed, will retry")
@@ -2,12 +2,15 @@
 """ User module
 """
 import hashlib
+
 from models.base import Base
 
 
 class User(Base):
     """ User class
     """
+    __slots__ = ('email', '_password', 'first_name', 'last_name')
+    INDEXED_ATTRIBUTES = ('email',)
 
     def __init__(self, *args: list, **kwargs: dict):
         """ Initialize a User instance
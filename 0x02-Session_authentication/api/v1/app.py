@@ -5,14 +5,21 @@ Route module for the API
 import os
 from os import getenv
 
+from api.v1.auth.context import AuthContext, auth_context
 from api.v1.views import app_views
-from flask import Flask, abort, jsonify, request
+from flask import Flask, abort, g, jsonify, request
 from flask_cors import CORS, cross_origin
 
 app = Flask(__name__)
 app.register_blueprint(app_views)
 CORS(app, resources={r"/api/v1/*": {"origins": "*"}})
 auth = None
+EXCLUDED_PATHS = (
+    '/api/v1/status/',
+    '/api/v1/unauthorized/',
+    '/api/v1/forbidden/',
+    '/api/v1/auth_session/login/',
+)
 
 if getenv('AUTH_TYPE') == 'auth':
     from api.v1.auth.auth import Auth
@@ -55,24 +62,30 @@ def forbidden(error) -> str:
 @app.before_request
 def before_request() -> str:
     """ Before request handler
+
+    The current user is resolved at most once per request, through the
+    AuthContext stored on flask.g, and only when the path needs it.
     """
     if auth is None:
         return
-    if auth.require_auth(
-            path=request.path,
-            exclude_paths=[
-                '/api/v1/status/',
-                '/api/v1/unauthorized/',
-                '/api/v1/forbidden/',
-                '/api/v1/auth_session/login/',
-            ],
-    ):
+    context = g.auth_context = AuthContext(auth, request)
+    if auth.require_auth(path=request.path, exclude_paths=EXCLUDED_PATHS):
         if auth.authorization_header(request) is None and auth.session_cookie(
                 request) is None:
             abort(401)
-        if auth.current_user(request) is None:
+        if context.user is None:
             abort(403)
-    request.current_user = auth.current_user(request)
+        request.current_user = context.user
+
+
+@app.after_request
+def after_request(response):
+    """ After request handler: record the auth counters of the request
+    """
+    context = auth_context()
+    if context is not None:
+        context.record()
+    return response
 
 
 if __name__ == "__main__":
@@ -2,10 +2,10 @@
 """
 Auth module for API
 """
-import re
 from os import getenv
 from typing import List, TypeVar
 
+from api.v1.auth.path_matcher import path_matcher
 from flask import request
 
 
@@ -18,6 +18,9 @@ class Auth:
         """
         Check if authentication is required for the given path.
 
+        Exclude paths match as prefixes of the path, and '*' matches any
+        run of characters.
+
         Args:
             path (str): The path to check.
             exclude_paths (List[str]): List of paths to exclude from authentication.
@@ -27,21 +30,12 @@ class Auth:
         """
         if path is None or exclude_paths is None or exclude_paths == []:
             return True
-        
+
         # Add trailing slash to the path if it doesn't have one
         path = path + '/' if path[-1] != '/' else path
-        
-        # Iterate over the exclude paths and check if the current path matches any of them
-        for exclude_path in exclude_paths:
-            # Convert the exclude path to a regular expression pattern
-            exclude_path = exclude_path.replace('/', '\\/').replace('*', '.*')
-            regex = re.compile(exclude_path)
-            
-            # Check if the current path matches the exclude path pattern
-            if regex.search(path):
-                return False
-
-        return True
+
+        # The matcher of these exclude paths is compiled on first use
+        return not path_matcher(tuple(exclude_paths)).match(path)
 
     def authorization_header(self, request=None) -> str:
         """
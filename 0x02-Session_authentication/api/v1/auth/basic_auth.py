@@ -3,9 +3,11 @@
 BasicAuth module for API
 """
 from base64 import b64decode
+from os import getenv
 from typing import Tuple, TypeVar
 
 from api.v1.auth.auth import Auth
+from api.v1.auth.credential_cache import CredentialCache
 from models.user import User
 
 
@@ -14,6 +16,17 @@ class BasicAuth(Auth):
     A basic auth class to manage the API authentication using Basic Auth.
     """
 
+    def __init__(self):
+        """
+        Initialize the credential cache from the BASIC_AUTH_CACHE_SIZE
+        and BASIC_AUTH_CACHE_TTL env variables.
+        """
+        size = getenv('BASIC_AUTH_CACHE_SIZE')
+        ttl = getenv('BASIC_AUTH_CACHE_TTL')
+        self.credential_cache = CredentialCache(
+            int(size) if size and size.isnumeric() else 1024,
+            int(ttl) if ttl and ttl.isnumeric() else 300)
+
     def extract_base64_authorization_header(self, authorization_header: str) -> str:
         """
         Extracts and returns the base64 part of the Authorization header for Basic Auth.
@@ -93,6 +106,8 @@ class BasicAuth(Auth):
         """
         Returns the current authenticated user based on the Basic Auth credentials.
 
+        Headers verified recently are answered from the credential cache.
+
         Args:
             request: The request object.
 
@@ -101,7 +116,13 @@ class BasicAuth(Auth):
             or invalid credentials.
         """
         header = self.authorization_header(request)
+        user = self.credential_cache.get(header)
+        if user is not None:
+            return user
         base64_header = self.extract_base64_authorization_header(header)
         decoded_header = self.decode_base64_authorization_header(base64_header)
         user_credentials = self.extract_user_credentials(decoded_header)
-        return self.user_object_from_credentials(user_credentials[0], user_credentials[1])
+        user = self.user_object_from_credentials(user_credentials[0], user_credentials[1])
+        if user is not None:
+            self.credential_cache.put(header, user)
+        return user
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Request-scoped authentication context module for the API
+"""
+import threading
+from collections import Counter
+from typing import Dict, TypeVar
+
+from flask import g
+
+_UNSET = object()
+_totals = Counter()
+_totals_lock = threading.Lock()
+
+
+class AuthContext:
+    """
+    Authentication state of one request.
+
+    The current user is resolved through the auth instance the first
+    time it is needed and reused afterwards. `lookups` counts the reads
+    of the user and `resolutions` the calls to auth.current_user, so
+    their difference is the number of resolutions saved.
+    """
+
+    def __init__(self, auth, request):
+        """
+        Initialize the context of a request.
+
+        Args:
+            auth: The Auth instance of the app.
+            request: The request object.
+        """
+        self.auth = auth
+        self.request = request
+        self.lookups = 0
+        self.resolutions = 0
+        self._user = _UNSET
+
+    @property
+    def user(self) -> TypeVar('User'):
+        """
+        Get the current user, resolving it on first access.
+
+        Returns:
+            TypeVar('User'): The authenticated user, or None.
+        """
+        self.lookups += 1
+        if self._user is _UNSET:
+            self.resolutions += 1
+            self._user = self.auth.current_user(self.request)
+        return self._user
+
+    def record(self) -> None:
+        """
+        Add the counters of this request to the process-wide totals.
+        """
+        with _totals_lock:
+            _totals['requests'] += 1
+            _totals['lookups'] += self.lookups
+            _totals['resolutions'] += self.resolutions
+
+
+def auth_context() -> AuthContext:
+    """
+    Get the authentication context of the current request.
+
+    Returns:
+        AuthContext: The context, or None if the app has no auth.
+    """
+    return g.get('auth_context')
+
+
+def auth_stats() -> Dict[str, int]:
+    """
+    Get the counters of every request served by this process.
+
+    Returns:
+        Dict[str, int]: Numbers of requests, user lookups and
+        resolutions.
+    """
+    with _totals_lock:
+        return dict(_totals)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Credential cache module for the API
+"""
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import TypeVar
+
+from models.user import User
+
+
+class CredentialCache:
+    """
+    Bounded LRU cache of verified Authorization headers.
+
+    Entries are keyed by an HMAC of the header under a per-process
+    secret, so the credentials themselves are never kept in memory, and
+    expire after `ttl` seconds. An entry remembers the user ID, email
+    and password hash it was verified against, and is dropped on lookup
+    once the user is removed or either value changed.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 300):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_size (int): Maximum number of entries, 0 disables caching.
+            ttl (float): Lifetime of an entry in seconds.
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._secret = os.urandom(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _key(self, header: str) -> bytes:
+        """
+        Compute the cache key of an Authorization header.
+
+        Args:
+            header (str): The Authorization header value.
+
+        Returns:
+            bytes: The HMAC-SHA256 digest of the header.
+        """
+        return hmac.new(self._secret, header.encode('utf-8', 'surrogatepass'),
+                        hashlib.sha256).digest()
+
+    def get(self, header: str) -> TypeVar('User'):
+        """
+        Get the user a header was verified for.
+
+        Args:
+            header (str): The Authorization header value.
+
+        Returns:
+            TypeVar('User'): The user, or None if the header is not
+            cached, expired, or the user changed since.
+        """
+        if self.max_size <= 0 or type(header) is not str:
+            return None
+        key = self._key(header)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[3] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        user_id, email, password, _ = entry
+        user = User.get(user_id)
+        if user is None or user.email != email or user.password != password:
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+        return user
+
+    def put(self, header: str, user: TypeVar('User')) -> None:
+        """
+        Remember that a header was verified for a user.
+
+        Args:
+            header (str): The Authorization header value.
+            user (TypeVar('User')): The authenticated user.
+        """
+        if self.max_size <= 0 or type(header) is not str:
+            return
+        key = self._key(header)
+        entry = (user.id, user.email, user.password,
+                 time.monotonic() + self.ttl)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Exclude-path matcher module for the API
+"""
+import re
+from functools import lru_cache
+from typing import Iterable
+
+_END = None
+
+
+class PathMatcher:
+    """
+    Prefix matcher for a fixed set of exclude paths.
+
+    Literal paths are stored in a character trie and paths containing
+    '*' (any run of characters) are combined into one regular
+    expression, so a lookup walks the path once whatever the number of
+    exclude paths. Decisions are cached per path.
+    """
+
+    def __init__(self, patterns: Iterable[str], cache_size: int = 1024):
+        """
+        Compile the exclude paths.
+
+        Args:
+            patterns (Iterable[str]): Exclude paths, which may contain '*'.
+            cache_size (int): Number of path decisions to remember.
+        """
+        self._trie = {}
+        wildcards = []
+        for pattern in patterns:
+            if '*' in pattern:
+                wildcards.append('.*'.join(
+                    re.escape(part) for part in pattern.split('*')))
+                continue
+            node = self._trie
+            for char in pattern:
+                node = node.setdefault(char, {})
+            node[_END] = True
+        self._regex = None
+        if wildcards:
+            self._regex = re.compile('|'.join(wildcards))
+        self.match = lru_cache(maxsize=cache_size)(self._match)
+
+    def _match(self, path: str) -> bool:
+        """
+        Check if the path starts with one of the exclude paths.
+
+        Args:
+            path (str): The path to check.
+
+        Returns:
+            bool: True if an exclude path matches, False otherwise.
+        """
+        node = self._trie
+        for char in path:
+            if _END in node:
+                return True
+            node = node.get(char)
+            if node is None:
+                break
+        else:
+            if _END in node:
+                return True
+        return self._regex is not None and \
+            self._regex.match(path) is not None
+
+
+@lru_cache(maxsize=32)
+def path_matcher(patterns: tuple) -> PathMatcher:
+    """
+    Get the compiled matcher of a tuple of exclude paths.
+
+    Args:
+        patterns (tuple): The exclude paths.
+
+    Returns:
+        PathMatcher: The matcher, compiled on first use.
+    """
+    return PathMatcher(patterns)
@@ -92,6 +92,6 @@ class SessionAuth(Auth):
         # Retrieve the user ID based on the session cookie
         if not user_id:
             return False
-        del self.user_id_by_session_id[session_cookie]  
+        self.user_id_by_session_id.pop(session_cookie, None)
         # Remove the session from the user_id_by_session_id dictionary
         return True
@@ -12,8 +12,13 @@ class SessionDBAuth(SessionExpAuth):
     """
     SessionDBAuth class for managing session-based authentication
     with database support.
+
+    Sessions are looked up through the session_id index of UserSession,
+    which is reloaded only for the records other processes changed.
     """
 
+    SWEEP_LIMIT = 100
+
     def create_session(self, user_id: str = None) -> str:
         """
         Creates a new session for the given user ID and saves
@@ -29,10 +34,61 @@ class SessionDBAuth(SessionExpAuth):
         session_id = super().create_session(user_id)
         if session_id is None:
             return None
+        UserSession.refresh()
         user_session = UserSession(user_id=user_id, session_id=session_id)
         user_session.save()
+        self.sweep_sessions()
         return session_id
 
+    def user_session(self, session_id: str = None) -> UserSession:
+        """
+        Retrieves the stored session with the given session ID.
+
+        Args:
+            session_id (str): The session ID.
+
+        Returns:
+            UserSession: The session, or None if it doesn't exist.
+        """
+        if session_id is None:
+            return None
+        UserSession.refresh()
+        user_session = UserSession.search({'session_id': session_id})
+        if len(user_session) == 0:
+            return None
+        return user_session[0]
+
+    def is_expired(self, user_session: UserSession) -> bool:
+        """
+        Checks if a stored session has expired.
+
+        Args:
+            user_session (UserSession): The session.
+
+        Returns:
+            bool: True if the session is older than session_duration.
+        """
+        if self.session_duration <= 0:
+            return False
+        return (user_session.created_at +
+                timedelta(seconds=self.session_duration)) < datetime.utcnow()
+
+    def sweep_sessions(self) -> int:
+        """
+        Removes the oldest expired sessions, at most SWEEP_LIMIT, found
+        through the created_at index instead of a scan and written to
+        the storage in one batch.
+
+        Returns:
+            int: The number of sessions removed.
+        """
+        if self.session_duration <= 0:
+            return 0
+        end = datetime.utcnow() - timedelta(seconds=self.session_duration)
+        expired = UserSession.search_range('created_at', end=end,
+                                           limit=self.SWEEP_LIMIT)
+        return UserSession.remove_many(expired)
+
     def user_id_for_session_id(self, session_id=None):
         """
         Retrieves the user ID associated with the given session ID
@@ -46,19 +102,13 @@ class SessionDBAuth(SessionExpAuth):
             or None if session_id is invalid
                 or the session has expired.
         """
-        if session_id is None:
-            return None
-        UserSession.load_from_file()
-        user_session = UserSession.search({'session_id': session_id})
-        if len(user_session) == 0:
+        user_session = self.user_session(session_id)
+        if user_session is None:
             return None
-        if self.session_duration <= 0:
-            return user_session[0].user_id
-        created_at = user_session[0].created_at
-        if (created_at + timedelta(seconds=self.session_duration)) \
-            < datetime.utcnow():
+        if self.is_expired(user_session):
+            user_session.remove()
             return None
-        return user_session[0].user_id
+        return user_session.user_id
 
     def destroy_session(self, request=None):
         """
@@ -77,9 +127,9 @@ class SessionDBAuth(SessionExpAuth):
         session_cookie = self.session_cookie(request)
         if not session_cookie:
             return False
-        user_session = UserSession.search({'session_id': session_cookie})
-        if len(user_session) == 0:
+        user_session = self.user_session(session_cookie)
+        if user_session is None:
             return False
-        del self.user_id_by_session_id[session_cookie]
-        user_session[0].remove()
+        self.user_id_by_session_id.pop(session_cookie, None)
+        user_session.remove()
         return True
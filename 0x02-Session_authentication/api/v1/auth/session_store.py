@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Expiring session store module for the API
+"""
+import heapq
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class SessionStore:
+    """
+    Mapping of session IDs to user IDs whose entries expire.
+
+    Expiry times are monotonic floats kept in a min-heap, so every
+    access first reclaims the sessions that expired, oldest first, in
+    O(log n) each, without sweeping the whole store. Heap items of
+    sessions that were replaced or deleted are skipped when popped, and
+    the heap is rebuilt once they outnumber the live sessions. With
+    `max_sessions`, the least recently used sessions are evicted past
+    that number.
+    """
+
+    def __init__(self, duration: float = 0, max_sessions: int = 0):
+        """
+        Initialize an empty store.
+
+        Args:
+            duration (float): Session lifetime in seconds, 0 for none.
+            max_sessions (int): Maximum number of sessions, 0 for none.
+        """
+        self.duration = duration
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._heap = []
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        """
+        Drop the sessions that expired before `now`.
+
+        Args:
+            now (float): The current monotonic time.
+        """
+        heap = self._heap
+        while heap and heap[0][0] < now:
+            expires_at, session_id = heapq.heappop(heap)
+            entry = self._sessions.get(session_id)
+            if entry is not None and entry[1] == expires_at:
+                del self._sessions[session_id]
+
+    def _compact(self) -> None:
+        """
+        Rebuild the heap once most of its items are stale.
+        """
+        if len(self._heap) > 2 * len(self._sessions) + 64:
+            self._heap = [(expires_at, session_id) for session_id,
+                          (_, expires_at) in self._sessions.items()]
+            heapq.heapify(self._heap)
+
+    def __setitem__(self, session_id: str, user_id: str) -> None:
+        """
+        Start or restart a session.
+
+        Args:
+            session_id (str): The session ID.
+            user_id (str): The ID of the user.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            expires_at = now + self.duration if self.duration > 0 \
+                else float('inf')
+            self._sessions[session_id] = (user_id, expires_at)
+            self._sessions.move_to_end(session_id)
+            if self.duration > 0:
+                heapq.heappush(self._heap, (expires_at, session_id))
+            while 0 < self.max_sessions < len(self._sessions):
+                self._sessions.popitem(last=False)
+            self._compact()
+
+    def get(self, session_id: str, default: str = None) -> str:
+        """
+        Get the user ID of a live session.
+
+        Args:
+            session_id (str): The session ID.
+            default (str): The value returned for unknown sessions.
+
+        Returns:
+            str: The user ID, or default if the session is unknown or
+            expired.
+        """
+        with self._lock:
+            self._expire(time.monotonic())
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return default
+            self._sessions.move_to_end(session_id)
+            return entry[0]
+
+    def pop(self, session_id: str, default: str = _MISSING) -> str:
+        """
+        Remove a session.
+
+        Args:
+            session_id (str): The session ID.
+            default (str): The value returned for unknown sessions.
+
+        Returns:
+            str: The user ID of the removed session, or default.
+
+        Raises:
+            KeyError: If the session is unknown and no default is given.
+        """
+        with self._lock:
+            self._expire(time.monotonic())
+            entry = self._sessions.pop(session_id, None)
+            self._compact()
+        if entry is not None:
+            return entry[0]
+        if default is _MISSING:
+            raise KeyError(session_id)
+        return default
+
+    def __getitem__(self, session_id: str) -> str:
+        """
+        Get the user ID of a live session.
+
+        Raises:
+            KeyError: If the session is unknown or expired.
+        """
+        user_id = self.get(session_id, _MISSING)
+        if user_id is _MISSING:
+            raise KeyError(session_id)
+        return user_id
+
+    def __delitem__(self, session_id: str) -> None:
+        """
+        Remove a session.
+
+        Raises:
+            KeyError: If the session is unknown or expired.
+        """
+        self.pop(session_id)
+
+    def __contains__(self, session_id: str) -> bool:
+        """
+        Check if a session is live.
+        """
+        return self.get(session_id, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        """
+        Count the live sessions.
+        """
+        with self._lock:
+            self._expire(time.monotonic())
+            return len(self._sessions)
+
+    def __repr__(self) -> str:
+        """
+        Represent the live sessions as a dictionary.
+        """
+        with self._lock:
+            self._expire(time.monotonic())
+            return repr({session_id: user_id for session_id, (user_id, _)
+                         in self._sessions.items()})
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """ Module of Users views
 """
+from api.v1.auth.context import auth_context
 from api.v1.views import app_views
 from flask import abort, jsonify, request
 from models.user import User
@@ -11,11 +12,29 @@ def view_all_users() -> str:
     """
     Handle the view all users route.
 
+    With a `limit` query parameter, returns one page of Users ordered by
+    creation time; the `cursor` of the next page is sent in the
+    X-Next-Cursor header.
+
     Returns:
-        str: JSON response containing a list of all User objects.
+        str: JSON response containing a list of all User objects,
+        or 400 if the limit or cursor is invalid.
     """
-    all_users = [user.to_json() for user in User.all()]
-    return jsonify(all_users)
+    limit = request.args.get('limit')
+    if limit is None:
+        all_users = [user.to_json() for user in User.all()]
+        return jsonify(all_users)
+    try:
+        limit = int(limit)
+        if limit < 1:
+            raise ValueError(limit)
+        users, cursor = User.paginate(limit, request.args.get('cursor'))
+    except ValueError:
+        return jsonify({'error': "invalid limit or cursor"}), 400
+    response = jsonify([user.to_json() for user in users])
+    if cursor is not None:
+        response.headers['X-Next-Cursor'] = cursor
+    return response
 
 
 @app_views.route('/users/<user_id>', methods=['GET'], strict_slashes=False)
@@ -33,10 +52,11 @@ def view_one_user(user_id: str = None) -> str:
     if user_id is None:
         abort(404)
     if user_id == 'me':
-        if request.current_user is None:
+        context = auth_context()
+        if context is None or context.user is None:
             abort(404)
         else:
-            return jsonify(request.current_user.to_json()), 200
+            return jsonify(context.user.to_json()), 200
 
     user = User.get(user_id)
     if user is None:
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+""" Memory benchmark: bytes per model object, before and after __slots__
+"""
+import sys
+import tracemalloc
+import uuid
+from datetime import datetime
+
+from models.user import User
+from models.user_session import UserSession
+
+
+class LegacyBase():
+    """ Previous layout: per-instance __dict__ and two datetime objects
+    """
+
+    def __init__(self, **kwargs):
+        """ Initialize a LegacyBase instance
+        """
+        self.id = kwargs.get('id', str(uuid.uuid4()))
+        self.created_at = datetime.utcnow()
+        self.updated_at = datetime.utcnow()
+
+
+class LegacyUser(LegacyBase):
+    """ Previous User layout
+    """
+
+    def __init__(self, **kwargs):
+        """ Initialize a LegacyUser instance
+        """
+        super().__init__(**kwargs)
+        self.email = kwargs.get('email')
+        self._password = kwargs.get('_password')
+        self.first_name = kwargs.get('first_name')
+        self.last_name = kwargs.get('last_name')
+
+
+class LegacyUserSession(LegacyBase):
+    """ Previous UserSession layout
+    """
+
+    def __init__(self, **kwargs):
+        """ Initialize a LegacyUserSession instance
+        """
+        super().__init__(**kwargs)
+        self.user_id = kwargs.get('user_id')
+        self.session_id = kwargs.get('session_id')
+
+
+def bytes_per_object(factory, count: int) -> float:
+    """ Average traced allocation of `count` objects built by `factory`
+
+    Attribute values are allocated before tracing starts, so only the
+    objects themselves are measured.
+    """
+    values = [{'id': str(uuid.uuid4()), 'email': "user{}@hbtn.io".format(i),
+               'user_id': str(uuid.uuid4()), 'session_id': str(uuid.uuid4())}
+              for i in range(count)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objs = [factory(**kwargs) for kwargs in values]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objs
+    return (after - before) / count
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for name, legacy, compact in (('User', LegacyUser, User),
+                                  ('UserSession', LegacyUserSession,
+                                   UserSession)):
+        old = bytes_per_object(legacy, count)
+        new = bytes_per_object(compact, count)
+        print("{}: {:.0f} -> {:.0f} bytes/object ({:.0%} saved)".format(
+            name, old, new, 1 - new / old))
@@ -1,38 +1,160 @@
 #!/usr/bin/env python3
 """ Base module
 """
-import json
+import math
+import time
 import uuid
-from datetime import datetime
-from os import path
-from typing import Iterable, List, TypeVar
+from bisect import bisect_left, bisect_right, insort
+from calendar import timegm
+from datetime import datetime, timedelta
+from functools import lru_cache
+from types import MemberDescriptorType
+from typing import Iterable, List, Tuple, TypeVar
+
+from models.cache import LRUCache
+from models.engine import storage
+from models.rwlock import DATA_LOCK
 
 TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+EPOCH = datetime(1970, 1, 1)
+EPOCH_ATTRIBUTES = {'_created_at': 'created_at', '_updated_at': 'updated_at'}
 DATA = {}
+ATTRIBUTES = {}
+INDEXES = {}
+INDEXED_VALUES = {}
+ORDERED_ATTRIBUTES = ('created_at', 'updated_at')
+ORDERED = {}
+_UNHASHABLE = object()
+_UNSET = object()
+
+
+def _new_objects() -> dict:
+    """ Empty object mapping of a class: every object stays loaded,
+    except with a queryable storage that only caches the recent ones
+    """
+    return LRUCache() if storage.queryable else {}
+
+
+def _now() -> float:
+    """ Current epoch seconds, truncated to the whole second that
+    TIMESTAMP_FORMAT persists
+    """
+    return float(math.floor(time.time()))
+
+
+def _to_epoch(value: datetime) -> float:
+    """ Convert a naive UTC datetime to epoch seconds
+    """
+    return (value - EPOCH).total_seconds()
+
+
+def _from_epoch(value: float) -> datetime:
+    """ Convert epoch seconds to a naive UTC datetime
+    """
+    return EPOCH + timedelta(seconds=value)
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(value: str) -> int:
+    """ Parse the YYYY-MM-DD part of a timestamp to epoch seconds
+    """
+    return timegm((int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                   0, 0, 0))
+
+
+@lru_cache(maxsize=4096)
+def parse_timestamp(value: str) -> float:
+    """ Parse a TIMESTAMP_FORMAT string to epoch seconds
+    """
+    return float(_parse_date(value[:10]) + int(value[11:13]) * 3600 +
+                 int(value[14:16]) * 60 + int(value[17:19]))
 
 
 class Base():
     """ Base class
+
+    Attributes live in __slots__ and timestamps are kept as whole epoch
+    seconds, the resolution they are stored with, and exposed as
+    datetime through created_at and updated_at.
+
+    Subclasses list in INDEXED_ATTRIBUTES the attributes that search()
+    looks up through a hash index. Assigning one of them to an indexed
+    object moves it in the index right away, so search() finds it by
+    its new value before it is saved.
     """
+    __slots__ = ('id', '_created_at', '_updated_at')
+    INDEXED_ATTRIBUTES: Tuple[str, ...] = ()
 
     def __init__(self, *args: list, **kwargs: dict):
         """ Initialize a Base instance
         """
         s_class = str(self.__class__.__name__)
         if DATA.get(s_class) is None:
-            DATA[s_class] = {}
+            DATA[s_class] = _new_objects()
+            self.__class__._reset_indexes()
 
         self.id = kwargs.get('id', str(uuid.uuid4()))
+        now = _now()
         if kwargs.get('created_at') is not None:
-            self.created_at = datetime.strptime(kwargs.get('created_at'),
-                                                TIMESTAMP_FORMAT)
+            self._created_at = parse_timestamp(kwargs.get('created_at'))
         else:
-            self.created_at = datetime.utcnow()
+            self._created_at = now
         if kwargs.get('updated_at') is not None:
-            self.updated_at = datetime.strptime(kwargs.get('updated_at'),
-                                                TIMESTAMP_FORMAT)
+            self._updated_at = parse_timestamp(kwargs.get('updated_at'))
         else:
-            self.updated_at = datetime.utcnow()
+            self._updated_at = now
+
+    def __init_subclass__(cls, **kwargs):
+        """ Route assignments of the indexed slots of a subclass through
+        _set_indexed, leaving reads to the slots
+        """
+        super().__init_subclass__(**kwargs)
+        for attr in cls.INDEXED_ATTRIBUTES:
+            slot = cls.__dict__.get(attr)
+            if isinstance(slot, MemberDescriptorType):
+                setattr(cls, attr, property(
+                    slot.__get__,
+                    lambda obj, value, attr=attr, slot=slot:
+                        obj._set_indexed(attr, slot, value),
+                    slot.__delete__))
+
+    def _set_indexed(self, attr: str, slot: MemberDescriptorType, value):
+        """ Set an indexed attribute, moving an indexed object to the
+        bucket of its new value
+        """
+        s_class = self.__class__.__name__
+        obj_id = getattr(self, 'id', None)
+        if obj_id not in INDEXED_VALUES.get(s_class, ()):
+            slot.__set__(self, value)
+            return
+        with DATA_LOCK.write():
+            slot.__set__(self, value)
+            if DATA[s_class].get(obj_id) is self:
+                self._index_update(attr)
+
+    @property
+    def created_at(self) -> datetime:
+        """ Creation time, naive UTC
+        """
+        return _from_epoch(self._created_at)
+
+    @created_at.setter
+    def created_at(self, value: datetime):
+        """ Set the creation time from a naive UTC datetime
+        """
+        self._created_at = float(math.floor(_to_epoch(value)))
+
+    @property
+    def updated_at(self) -> datetime:
+        """ Last update time, naive UTC
+        """
+        return _from_epoch(self._updated_at)
+
+    @updated_at.setter
+    def updated_at(self, value: datetime):
+        """ Set the last update time from a naive UTC datetime
+        """
+        self._updated_at = float(math.floor(_to_epoch(value)))
 
     def __eq__(self, other: TypeVar('Base')) -> bool:
         """ Equality
@@ -43,11 +165,31 @@ class Base():
             return False
         return (self.id == other.id)
 
+    @classmethod
+    def _attributes(cls) -> Tuple[str, ...]:
+        """ Slot names of the class and its parents, in declaration order
+        """
+        attributes = ATTRIBUTES.get(cls)
+        if attributes is None:
+            attributes = ()
+            for klass in reversed(cls.__mro__):
+                attributes += tuple(klass.__dict__.get('__slots__', ()))
+            ATTRIBUTES[cls] = attributes
+        return attributes
+
     def to_json(self, for_serialization: bool = False) -> dict:
         """ Convert the object a JSON dictionary
         """
         result = {}
-        for key, value in self.__dict__.items():
+        items = [(key, getattr(self, key, _UNSET))
+                 for key in self._attributes()]
+        items.extend(getattr(self, '__dict__', {}).items())
+        for key, value in items:
+            if value is _UNSET:
+                continue
+            if key in EPOCH_ATTRIBUTES:
+                key = EPOCH_ATTRIBUTES[key]
+                value = _from_epoch(value)
             if not for_serialization and key[0] == '_':
                 continue
             if type(value) is datetime:
@@ -56,55 +198,271 @@ class Base():
                 result[key] = value
         return result
 
+    @classmethod
+    def from_json(cls, obj_json: dict) -> TypeVar('Base'):
+        """ Build an object from its serialized form, skipping __init__
+
+        Each slot is read from the key of the same name, as the __init__
+        of Base and its subclasses do, and timestamps go through the
+        cached parse_timestamp instead of strptime. Classes whose
+        instances have a __dict__ fall back to the regular constructor.
+        """
+        if cls.__dictoffset__:
+            return cls(**obj_json)
+        obj = cls.__new__(cls)
+        get = obj_json.get
+        for key in cls._attributes():
+            if key in EPOCH_ATTRIBUTES:
+                value = get(EPOCH_ATTRIBUTES[key])
+                setattr(obj, key, _now() if value is None
+                        else parse_timestamp(value))
+            else:
+                setattr(obj, key, get(key))
+        return obj
+
+    @classmethod
+    def _reset_indexes(cls):
+        """ Drop and recreate the secondary indexes of the class
+        """
+        s_class = cls.__name__
+        INDEXES[s_class] = {attr: {} for attr in cls.INDEXED_ATTRIBUTES}
+        INDEXED_VALUES[s_class] = {}
+        ORDERED[s_class] = {attr: [] for attr in ORDERED_ATTRIBUTES}
+        storage.register(s_class, cls.INDEXED_ATTRIBUTES)
+
+    def _index_add(self, ordered: bool = True):
+        """ Add the object to the secondary indexes of its class
+
+        The (timestamp, ID) keys of the ordered indexes are inserted in
+        place unless `ordered` is False, for callers that sort them in
+        bulk afterwards.
+        """
+        s_class = self.__class__.__name__
+        values = []
+        for attr, index in INDEXES[s_class].items():
+            value = getattr(self, attr, None)
+            try:
+                index.setdefault(value, {})[self.id] = self
+            except TypeError:
+                value = _UNHASHABLE
+            values.append(value)
+        for attr, keys in ORDERED[s_class].items():
+            stamp = getattr(self, '_' + attr)
+            if ordered:
+                insort(keys, (stamp, self.id))
+            values.append(stamp)
+        INDEXED_VALUES[s_class][self.id] = values
+
+    def _index_update(self, attr: str):
+        """ Move the object to the bucket of the current value of `attr`
+        in the hash index of its class
+        """
+        s_class = self.__class__.__name__
+        values = INDEXED_VALUES[s_class].get(self.id)
+        if values is None:
+            return
+        indexes = INDEXES[s_class]
+        i = list(indexes).index(attr)
+        index = indexes[attr]
+        bucket = index.get(values[i])
+        if bucket is not None:
+            bucket.pop(self.id, None)
+            if not bucket:
+                del index[values[i]]
+        value = getattr(self, attr, None)
+        try:
+            index.setdefault(value, {})[self.id] = self
+        except TypeError:
+            value = _UNHASHABLE
+        values[i] = value
+
+    def _index_remove(self):
+        """ Remove the object from the secondary indexes of its class
+        """
+        s_class = self.__class__.__name__
+        values = INDEXED_VALUES[s_class].pop(self.id, None)
+        if values is None:
+            return
+        for index, value in zip(INDEXES[s_class].values(), values):
+            bucket = index.get(value)
+            if bucket is not None:
+                bucket.pop(self.id, None)
+                if not bucket:
+                    del index[value]
+        stamps = values[len(INDEXES[s_class]):]
+        for keys, stamp in zip(ORDERED[s_class].values(), stamps):
+            key = (stamp, self.id)
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
+
     @classmethod
     def load_from_file(cls):
         """ Load all objects from file
+
+        A queryable storage is read on demand, so nothing is loaded and
+        the object cache of the class is emptied. Objects are built
+        before DATA_LOCK is taken, so readers only wait while the new
+        objects are swapped in and indexed.
         """
         s_class = cls.__name__
-        file_path = ".db_{}.json".format(s_class)
-        DATA[s_class] = {}
-        if not path.exists(file_path):
-            return
+        objs = _new_objects()
+        if not storage.queryable:
+            from_json = cls.from_json
+            for obj_id, obj_json in storage.iter_load(s_class):
+                objs[obj_id] = from_json(obj_json)
+        with DATA_LOCK.write():
+            DATA[s_class] = objs
+            cls._reset_indexes()
+            for obj in objs.values():
+                obj._index_add(ordered=False)
+            for attr, keys in ORDERED[s_class].items():
+                slot = '_' + attr
+                keys.extend(sorted((getattr(obj, slot), obj_id)
+                                   for obj_id, obj in objs.items()))
 
-        with open(file_path, 'r') as f:
-            objs_json = json.load(f)
-            for obj_id, obj_json in objs_json.items():
-                DATA[s_class][obj_id] = cls(**obj_json)
+    @classmethod
+    def refresh(cls):
+        """ Reload the objects changed on disk by other processes
+
+        Nothing is read when the storage reports no change. When it can
+        tell which objects changed, only those are rebuilt and swapped
+        in; otherwise the whole class is loaded again.
+        """
+        s_class = cls.__name__
+        objs = DATA.get(s_class)
+        changes = None if objs is None else storage.changes(s_class)
+        if changes is None:
+            cls.load_from_file()
+            return
+        updates = []
+        for obj_id, obj_json in changes:
+            current = objs.get(obj_id)
+            if obj_json is None:
+                if current is not None:
+                    updates.append((obj_id, None))
+            elif current is None or current.to_json(True) != obj_json:
+                updates.append((obj_id, cls.from_json(obj_json)))
+        if not updates:
+            return
+        with DATA_LOCK.write():
+            for obj_id, obj in updates:
+                current = objs.pop(obj_id, None)
+                if current is not None:
+                    current._index_remove()
+                if obj is not None:
+                    objs[obj_id] = obj
+                    obj._index_add()
 
     @classmethod
     def save_to_file(cls):
         """ Save all objects to file
         """
+        if storage.queryable:
+            return
         s_class = cls.__name__
-        file_path = ".db_{}.json".format(s_class)
         objs_json = {}
-        for obj_id, obj in DATA[s_class].items():
-            objs_json[obj_id] = obj.to_json(True)
+        with DATA_LOCK.read():
+            for obj_id, obj in DATA[s_class].items():
+                objs_json[obj_id] = obj.to_json(True)
+        storage.dump(s_class, objs_json)
 
-        with open(file_path, 'w') as f:
-            json.dump(objs_json, f)
+    @classmethod
+    def flush(cls):
+        """ Write pending changes of every class to disk now
+        """
+        storage.flush()
 
     def save(self):
         """ Save current object
         """
         s_class = self.__class__.__name__
-        self.updated_at = datetime.utcnow()
-        DATA[s_class][self.id] = self
-        self.__class__.save_to_file()
+        self._updated_at = _now()
+        if storage.queryable:
+            storage.save(s_class, self, None)
+            DATA[s_class][self.id] = self
+            return
+        with DATA_LOCK.write():
+            DATA[s_class][self.id] = self
+            self._index_remove()
+            self._index_add()
+        storage.save(s_class, self, DATA[s_class])
 
     def remove(self):
         """ Remove object
         """
         s_class = self.__class__.__name__
-        if DATA[s_class].get(self.id) is not None:
-            del DATA[s_class][self.id]
-            self.__class__.save_to_file()
+        if storage.queryable:
+            storage.remove(s_class, self, None)
+            DATA[s_class].pop(self.id, None)
+            return
+        with DATA_LOCK.write():
+            removed = DATA[s_class].pop(self.id, None) is not None
+            if removed:
+                self._index_remove()
+        if removed:
+            storage.remove(s_class, self, DATA[s_class])
+
+    @classmethod
+    def remove_many(cls, objs: Iterable[TypeVar('Base')]) -> int:
+        """ Remove several objects of the class
+
+        The objects leave DATA in one pass under DATA_LOCK and the
+        storage writes them in one batch, instead of once per object.
+        Returns the number of objects removed.
+        """
+        s_class = cls.__name__
+        objs = list(objs)
+        if storage.queryable:
+            storage.write_batch(s_class, [('remove', obj) for obj in objs],
+                                None)
+            for obj in objs:
+                DATA[s_class].pop(obj.id, None)
+            return len(objs)
+        with DATA_LOCK.write():
+            removed = [obj for obj in objs
+                       if DATA[s_class].pop(obj.id, None) is not None]
+            for obj in removed:
+                obj._index_remove()
+        if removed:
+            storage.write_batch(s_class,
+                                [('remove', obj) for obj in removed],
+                                DATA[s_class])
+        return len(removed)
+
+    @classmethod
+    def _cache(cls) -> LRUCache:
+        """ Object cache of the class with a queryable storage, emptied
+        first if another process wrote the class
+        """
+        s_class = cls.__name__
+        if DATA.get(s_class) is None:
+            cls.load_from_file()
+        elif storage.changes(s_class) is None:
+            DATA[s_class].clear()
+        return DATA[s_class]
+
+    @classmethod
+    def _cached(cls, cache: LRUCache, obj_json: dict,
+                keep: bool = True) -> TypeVar('Base'):
+        """ Cached object of a serialized object, built and cached if
+        missing; `keep` False leaves the cache alone, so that scans do
+        not evict the hot objects
+        """
+        obj = cache.get(obj_json['id'])
+        if obj is None:
+            obj = cls.from_json(obj_json)
+            if keep:
+                obj = cache.setdefault(obj.id, obj)
+        return obj
 
     @classmethod
     def count(cls) -> int:
         """ Count all objects
         """
         s_class = cls.__name__
+        if storage.queryable:
+            return storage.count(s_class)
         return len(DATA[s_class].keys())
 
     @classmethod
@@ -118,13 +476,32 @@ class Base():
         """ Return one object by ID
         """
         s_class = cls.__name__
+        if storage.queryable:
+            cache = cls._cache()
+            obj = cache.get(id)
+            if obj is None:
+                obj_json = storage.get(s_class, id)
+                if obj_json is not None:
+                    obj = cls._cached(cache, obj_json)
+            return obj
         return DATA[s_class].get(id)
 
     @classmethod
     def search(cls, attributes: dict = {}) -> List[TypeVar('Base')]:
         """ Search all objects with matching attributes
+
+        Uses a secondary index when one of the attributes has one,
+        otherwise scans every object of the class. A queryable storage
+        runs the search itself, and only objects found through an
+        indexed attribute are added to the object cache.
         """
         s_class = cls.__name__
+        if storage.queryable:
+            cache = cls._cache()
+            keep = any(k == 'id' or k in cls.INDEXED_ATTRIBUTES
+                       for k in attributes)
+            return [cls._cached(cache, obj_json, keep)
+                    for obj_json in storage.search(s_class, attributes)]
 
         def _search(obj):
             if len(attributes) == 0:
@@ -134,4 +511,83 @@ class Base():
                     return False
             return True
 
-        return list(filter(_search, DATA[s_class].values()))
+        with DATA_LOCK.read():
+            candidates = DATA[s_class].values()
+            for k, v in attributes.items():
+                index = INDEXES[s_class].get(k)
+                if index is None:
+                    continue
+                try:
+                    candidates = index.get(v, {}).values()
+                except TypeError:
+                    continue
+                break
+            return list(filter(_search, candidates))
+
+    @classmethod
+    def search_range(cls, attr: str = 'created_at', start: datetime = None,
+                     end: datetime = None, after: Tuple[float, str] = None,
+                     limit: int = None) -> List[TypeVar('Base')]:
+        """ Objects whose `attr` timestamp is in [start, end), oldest first
+
+        Objects are ordered by (timestamp, ID) through a sorted index, so
+        only the objects returned are visited. `after` is a keyset cursor
+        of (epoch seconds, ID): only objects ordered after it are
+        returned. A queryable storage runs the query itself.
+
+        Timestamps have a resolution of one second, so the bounds are
+        rounded up to the next whole second, which keeps their meaning.
+        """
+        if attr not in ORDERED_ATTRIBUTES:
+            raise ValueError("{} is not an ordered attribute".format(attr))
+        s_class = cls.__name__
+        if type(start) is datetime:
+            start = _to_epoch(start)
+        if start is not None:
+            start = float(math.ceil(start))
+        if type(end) is datetime:
+            end = _to_epoch(end)
+        if end is not None:
+            end = float(math.ceil(end))
+        if storage.queryable:
+            cache = cls._cache()
+            return [cls._cached(cache, obj_json, False)
+                    for obj_json in storage.search_range(
+                        s_class, attr, start, end, after, limit)]
+        with DATA_LOCK.read():
+            keys = ORDERED[s_class][attr]
+            lo = 0 if start is None else bisect_left(keys, (start,))
+            if after is not None:
+                lo = max(lo, bisect_right(keys, tuple(after)))
+            hi = len(keys) if end is None else bisect_left(keys, (end,))
+            if limit is not None:
+                hi = min(hi, lo + limit)
+            objs = DATA[s_class]
+            return [objs[obj_id] for _, obj_id in keys[lo:hi]]
+
+    @classmethod
+    def paginate(cls, limit: int, cursor: str = None,
+                 attr: str = 'created_at') -> Tuple[List[TypeVar('Base')],
+                                                    str]:
+        """ One page of objects ordered by `attr`, and the cursor of the
+        next page, or None on the last page
+
+        The cursor holds the whole-second timestamp and the ID of the
+        last object, so it stays valid in any process sharing the storage.
+        Raises ValueError on a malformed cursor.
+        """
+        after = None
+        if cursor:
+            stamp, _, obj_id = cursor.partition(',')
+            if not obj_id:
+                raise ValueError("invalid cursor")
+            try:
+                after = (float(math.floor(float(stamp))), obj_id)
+            except OverflowError:
+                raise ValueError("invalid cursor")
+        objs = cls.search_range(attr, after=after, limit=limit + 1)
+        if len(objs) <= limit:
+            return objs, None
+        last = objs[limit - 1]
+        return objs[:limit], "{},{}".format(
+            math.floor(getattr(last, '_' + attr)), last.id)
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+""" File storage module
+"""
+import json
+import os
+import threading
+from os import getenv
+from typing import Iterator, List, TextIO, Tuple
+
+from models.rwlock import DATA_LOCK
+
+STREAM_LOAD = bool(getenv('MODEL_STREAM_LOAD'))
+CHUNK_SIZE = 1 << 16
+_WHITESPACE = " \t\n\r"
+
+
+def signature(file_path: str) -> Tuple[int, int, int]:
+    """ (inode, size, mtime) of a file, or None if it does not exist
+    """
+    try:
+        st = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def _fsignature(f) -> Tuple[int, int, int]:
+    """ (inode, size, mtime) of an open file
+    """
+    st = os.fstat(f.fileno())
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+def iter_json_object(f: TextIO,
+                     chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple]:
+    """ Yield the (key, value) pairs of a top-level JSON object
+
+    The file is read in chunks and each member is decoded on its own,
+    so the whole document is never held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+    started = False
+    while True:
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+        if pos < len(buf):
+            if not started:
+                if buf[pos] != '{':
+                    raise ValueError("expected a JSON object")
+                started = True
+                pos += 1
+                continue
+            if buf[pos] == '}':
+                return
+            if buf[pos] == ',':
+                pos += 1
+                continue
+            try:
+                key, end = decoder.raw_decode(buf, pos)
+                while buf[end] in _WHITESPACE:
+                    end += 1
+                if buf[end] != ':':
+                    raise ValueError("expected ':' after an object key")
+                end += 1
+                while buf[end] in _WHITESPACE:
+                    end += 1
+                value, end = decoder.raw_decode(buf, end)
+                while buf[end] in _WHITESPACE:
+                    end += 1
+                if buf[end] not in ',}':
+                    raise ValueError("expected ',' or '}' after a value")
+            except (IndexError, json.JSONDecodeError):
+                if eof:
+                    raise
+            else:
+                yield key, value
+                pos = end
+                continue
+        if eof:
+            raise ValueError("unexpected end of JSON document")
+        chunk = f.read(chunk_size)
+        eof = chunk == ""
+        buf = buf[pos:] + chunk
+        pos = 0
+
+
+class FileStorage():
+    """ Store each class as one JSON document: .db_<Class>.json
+
+    Writes are serialized by a lock, so the last document written is
+    always built from the latest snapshot of the objects. Snapshots are
+    taken under a shared DATA_LOCK and the file is written after it is
+    released, so readers of DATA never wait on disk I/O. Documents are
+    written to a temporary file and renamed over the old one, so
+    readers never see a partially written file.
+
+    The signature of the document is remembered on every load and write
+    of this process, so changes() can tell when another process
+    replaced it.
+    """
+    queryable = False
+
+    def __init__(self, stream: bool = STREAM_LOAD):
+        """ Initialize a FileStorage, streaming loads when `stream` is set
+        """
+        self.stream = stream
+        self._lock = threading.RLock()
+        self._seen = {}
+
+    def file_path(self, s_class: str) -> str:
+        """ Path of the JSON document of a class
+        """
+        return ".db_{}.json".format(s_class)
+
+    def load(self, s_class: str) -> dict:
+        """ Return the serialized objects of a class, keyed by ID
+        """
+        self._seen[s_class], objs_json = self._read(s_class)
+        return objs_json
+
+    def _read(self, s_class: str) -> Tuple[Tuple[int, int, int], dict]:
+        """ Signature and content of the JSON document of a class
+        """
+        try:
+            f = open(self.file_path(s_class), 'r')
+        except FileNotFoundError:
+            return None, {}
+        with f:
+            return _fsignature(f), json.load(f)
+
+    def changes(self, s_class: str) -> List[Tuple[str, dict]]:
+        """ Objects changed by other processes since the last load
+
+        Returns an empty list when nothing changed, or None when the
+        whole class must be loaded again.
+        """
+        if signature(self.file_path(s_class)) == self._seen.get(s_class):
+            return []
+        return None
+
+    def register(self, s_class: str, indexed_attributes: Tuple[str, ...]):
+        """ Nothing to prepare: indexes are kept in memory by Base
+        """
+
+    def iter_load(self, s_class: str) -> Iterator[Tuple[str, dict]]:
+        """ Yield the (ID, serialized object) pairs of a class
+        """
+        if not self.stream:
+            yield from self.load(s_class).items()
+            return
+        try:
+            f = open(self.file_path(s_class), 'r')
+        except FileNotFoundError:
+            self._seen[s_class] = None
+            return
+        with f:
+            self._seen[s_class] = _fsignature(f)
+            yield from iter_json_object(f)
+
+    def dump(self, s_class: str, objs_json: dict):
+        """ Replace the stored objects of a class
+        """
+        with self._lock:
+            self._write(s_class, objs_json)
+
+    def _write(self, s_class: str, objs_json: dict):
+        """ Atomically replace the JSON document of a class
+        """
+        file_path = self.file_path(s_class)
+        tmp_path = "{}.{}.tmp".format(file_path, os.getpid())
+        with open(tmp_path, 'w') as f:
+            json.dump(objs_json, f)
+            f.flush()
+            self._seen[s_class] = _fsignature(f)
+        os.replace(tmp_path, file_path)
+
+    def save(self, s_class: str, obj, objs: dict):
+        """ Persist a created or updated object
+        """
+        self.write_batch(s_class, [('save', obj)], objs)
+
+    def remove(self, s_class: str, obj, objs: dict):
+        """ Persist the removal of an object
+        """
+        self.write_batch(s_class, [('remove', obj)], objs)
+
+    def write_batch(self, s_class: str, ops: list, objs: dict):
+        """ Persist a list of ('save' | 'remove', obj) mutations
+
+        The whole document is rewritten once, whatever the number of ops.
+        """
+        with self._lock:
+            with DATA_LOCK.read():
+                objs_json = {obj_id: o.to_json(True)
+                             for obj_id, o in objs.items()}
+            self._write(s_class, objs_json)
+
+    def flush(self):
+        """ Nothing is buffered: every write is already on disk
+        """
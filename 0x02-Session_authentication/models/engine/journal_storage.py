@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+""" Journal storage module
+"""
+import atexit
+import fcntl
+import json
+import os
+import threading
+from contextlib import contextmanager
+from os import getenv, path
+from typing import List, Tuple
+
+from models.engine.file_storage import FileStorage, signature
+
+JOURNAL_MAX_BYTES = int(getenv('MODEL_JOURNAL_MAX_BYTES', 1 << 20))
+
+
+@contextmanager
+def file_lock(lock_path: str, operation: int = fcntl.LOCK_EX):
+    """ Hold an flock() on `lock_path` for the duration of a with block
+
+    The lock file is opened on every call, so threads of one process
+    exclude each other like other processes do.
+    """
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, operation)
+        yield
+    finally:
+        os.close(fd)
+
+
+class JournalStorage(FileStorage):
+    """ Append one record per mutation to .db_<Class>.journal
+
+    The JSON document of FileStorage is kept as a snapshot. Once the
+    journal passes max_bytes it is rotated to .db_<Class>.journal.1 and
+    merged into the snapshot by a background thread, while new records
+    go to a fresh journal. Loading replays both journals, oldest first,
+    on top of the snapshot.
+
+    Processes sharing the files coordinate through flock() on
+    .db_<Class>.lock: appends and loads hold it shared, while rotating
+    the journal, replacing the snapshot and dropping the rotated
+    journal hold it exclusive. The journal is not rotated again until
+    the rotated one is merged, and only the holder of
+    .db_<Class>.compact.lock merges it.
+
+    The inode of the active journal and the offset read so far are
+    remembered, so changes() only reads records appended since.
+    """
+
+    def __init__(self, max_bytes: int = JOURNAL_MAX_BYTES):
+        """ Initialize a JournalStorage
+        """
+        super().__init__(stream=False)
+        self.max_bytes = max_bytes
+        self._compactions = {}
+        self._journals = {}
+        atexit.register(self._wait_compactions)
+
+    def journal_path(self, s_class: str) -> str:
+        """ Path of the active journal of a class
+        """
+        return ".db_{}.journal".format(s_class)
+
+    def rotated_path(self, s_class: str) -> str:
+        """ Path of the journal being merged into the snapshot
+        """
+        return "{}.1".format(self.journal_path(s_class))
+
+    def lock_path(self, s_class: str) -> str:
+        """ Path of the lock file guarding the journals and snapshot
+        """
+        return ".db_{}.lock".format(s_class)
+
+    def compact_lock_path(self, s_class: str) -> str:
+        """ Path of the lock file held while merging the rotated journal
+        """
+        return ".db_{}.compact.lock".format(s_class)
+
+    @staticmethod
+    def _read_journal(journal_path: str,
+                      offset: int = 0) -> Tuple[List[dict], int, int]:
+        """ Records of a journal from `offset`, with the journal inode and
+        the offset after the last complete record
+        """
+        try:
+            f = open(journal_path, 'rb')
+        except FileNotFoundError:
+            return [], None, 0
+        records = []
+        with f:
+            inode = os.fstat(f.fileno()).st_ino
+            f.seek(offset)
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("incomplete record")
+                    records.append(json.loads(line))
+                except ValueError:
+                    # torn or in-progress write at the end of the journal
+                    break
+                offset += len(line)
+        return records, inode, offset
+
+    @staticmethod
+    def _replay(records: List[dict], objs_json: dict):
+        """ Apply journal records to serialized objects
+        """
+        for record in records:
+            if record['op'] == 'save':
+                objs_json[record['id']] = record['obj']
+            else:
+                objs_json.pop(record['id'], None)
+
+    def load(self, s_class: str) -> dict:
+        """ Return the serialized objects of a class, keyed by ID
+        """
+        with file_lock(self.lock_path(s_class), fcntl.LOCK_SH):
+            objs_json = super().load(s_class)
+            self._replay(self._read_journal(self.rotated_path(s_class))[0],
+                         objs_json)
+            records, inode, offset = self._read_journal(
+                self.journal_path(s_class))
+        self._replay(records, objs_json)
+        self._journals[s_class] = (inode, offset)
+        return objs_json
+
+    def changes(self, s_class: str) -> List[Tuple[str, dict]]:
+        """ Objects changed by other processes since the last load
+
+        Returns the (ID, serialized object or None if removed) pairs of
+        the records appended since, or None when the snapshot changed or
+        the journal was rotated and the whole class must be loaded again.
+        """
+        if super().changes(s_class) is None:
+            return None
+        inode, offset = self._journals.get(s_class, (None, 0))
+        current = signature(self.journal_path(s_class))
+        if current is None:
+            return [] if inode is None else None
+        if inode is not None and current[0] != inode:
+            return None
+        if current[1] == offset:
+            return []
+        records, current_inode, offset = self._read_journal(
+            self.journal_path(s_class), offset)
+        if current_inode != inode:
+            # rotated since the signature was taken
+            return None
+        self._journals[s_class] = (inode, offset)
+        changed = {}
+        for record in records:
+            changed[record['id']] = record.get('obj')
+        return list(changed.items())
+
+    def dump(self, s_class: str, objs_json: dict):
+        """ Write a full snapshot and discard the journals
+        """
+        with self._lock, file_lock(self.lock_path(s_class)):
+            self._write(s_class, objs_json)
+            for journal_path in (self.rotated_path(s_class),
+                                 self.journal_path(s_class)):
+                if path.exists(journal_path):
+                    os.remove(journal_path)
+            self._journals[s_class] = (None, 0)
+
+    def write_batch(self, s_class: str, ops: list, objs: dict):
+        """ Append one record per mutation, in a single write
+
+        Records are serialized under the journal lock, so concurrent
+        writes of one object are journaled in the order of their states.
+        """
+        with self._lock:
+            lines = []
+            for op, obj in ops:
+                if op == 'save':
+                    record = {'op': op, 'id': obj.id,
+                              'obj': obj.to_json(True)}
+                else:
+                    record = {'op': op, 'id': obj.id}
+                lines.append(json.dumps(record) + "\n")
+            self._append(s_class, "".join(lines))
+
+    def _append(self, s_class: str, data: str):
+        """ Append records, rotating the journal when it is too large
+        """
+        journal_path = self.journal_path(s_class)
+        with self._lock:
+            with file_lock(self.lock_path(s_class), fcntl.LOCK_SH):
+                with open(journal_path, 'a') as f:
+                    f.write(data)
+                    size = f.tell()
+            if size >= self.max_bytes and not self._compacting(s_class):
+                self._rotate(s_class)
+
+    def _rotate(self, s_class: str):
+        """ Rotate the journal unless a rotated one is still unmerged,
+        and merge the rotated journal in a background thread
+
+        Nothing is done while another thread or process is merging.
+        """
+        compact_fd = os.open(self.compact_lock_path(s_class),
+                             os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(compact_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(compact_fd)
+            return
+        journal_path = self.journal_path(s_class)
+        rotated_path = self.rotated_path(s_class)
+        with file_lock(self.lock_path(s_class)):
+            current = signature(journal_path)
+            if not path.exists(rotated_path) and current is not None \
+                    and current[1] >= self.max_bytes:
+                os.replace(journal_path, rotated_path)
+            rotated = signature(rotated_path)
+        if rotated is None:
+            os.close(compact_fd)
+            return
+        thread = threading.Thread(target=self._compact,
+                                  args=(s_class, rotated, compact_fd),
+                                  daemon=True)
+        self._compactions[s_class] = thread
+        thread.start()
+
+    def _compacting(self, s_class: str) -> bool:
+        """ Whether a compaction of the class is running in this process
+        """
+        thread = self._compactions.get(s_class)
+        return thread is not None and thread.is_alive()
+
+    def _wait_compactions(self):
+        """ Block until the running compactions of this process are done
+        """
+        for thread in list(self._compactions.values()):
+            thread.join()
+
+    def _compact(self, s_class: str, rotated: Tuple[int, int, int],
+                 compact_fd: int):
+        """ Merge the rotated journal into the snapshot, then release
+        `compact_fd`
+
+        The merged snapshot is written aside and only swapped in if the
+        snapshot and rotated journal it was built from are unchanged, so
+        a concurrent dump() wins. The signature of the snapshot seen by
+        this process is left alone: the records merged may not be
+        loaded here yet.
+        """
+        file_path = self.file_path(s_class)
+        rotated_path = self.rotated_path(s_class)
+        tmp_path = "{}.{}.compact.tmp".format(file_path, os.getpid())
+        try:
+            seen, objs_json = self._read(s_class)
+            self._replay(self._read_journal(rotated_path)[0], objs_json)
+            with open(tmp_path, 'w') as f:
+                json.dump(objs_json, f)
+            with file_lock(self.lock_path(s_class)):
+                if signature(file_path) == seen and \
+                        signature(rotated_path) == rotated:
+                    os.replace(tmp_path, file_path)
+                    os.remove(rotated_path)
+        finally:
+            if path.exists(tmp_path):
+                os.remove(tmp_path)
+            os.close(compact_fd)
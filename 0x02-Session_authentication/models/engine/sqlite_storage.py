@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+""" SQLite storage module
+"""
+import json
+import math
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from os import getenv
+from typing import Iterator, List, Tuple
+
+SQLITE_PATH = getenv('MODEL_SQLITE_PATH', '.db_models.sqlite')
+TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+COLUMNS = ('id', 'created_at', 'updated_at')
+
+
+class SQLiteStorage():
+    """ Store each class as a table of one SQLite database
+
+    Rows hold the serialized object in a `data` JSON column next to the
+    id and timestamp columns. Declared indexed attributes get an index on
+    json_extract(data, '$.<attribute>'), so get, search and count run as
+    indexed SQL queries instead of scans of in-memory dictionaries. Each
+    thread has its own connection, and WAL mode lets several processes
+    share the file.
+
+    Triggers keep the row count and a write version of every table in
+    the `_meta` table, so count() is a single row lookup and changes()
+    can tell when another process wrote a class.
+    """
+    queryable = True
+
+    def __init__(self, db_path: str = SQLITE_PATH):
+        """ Initialize a SQLiteStorage on the database at `db_path`
+        """
+        self.db_path = db_path
+        self._local = threading.local()
+        self._tables = set()
+        self._versions = {}
+        self._versions_lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """ Connection of the calling thread
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def register(self, s_class: str, indexed_attributes: Tuple[str, ...]):
+        """ Create the table of a class and its indexes if needed
+        """
+        conn = self._connection()
+        name = "'{}'".format(s_class.replace("'", "''"))
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute('CREATE TABLE IF NOT EXISTS _meta ('
+                         'name TEXT PRIMARY KEY, count INTEGER NOT NULL, '
+                         'version INTEGER NOT NULL)')
+            conn.execute('CREATE TABLE IF NOT EXISTS "{0}" ('
+                         'id TEXT PRIMARY KEY, created_at TEXT, '
+                         'updated_at TEXT, data TEXT NOT NULL)'.format(
+                             s_class))
+            for column in COLUMNS[1:]:
+                conn.execute('CREATE INDEX IF NOT EXISTS "{0}_{1}" '
+                             'ON "{0}" ({1}, id)'.format(s_class, column))
+            for attr in indexed_attributes:
+                conn.execute('CREATE INDEX IF NOT EXISTS "{0}_{1}" ON "{0}" '
+                             '({2})'.format(s_class, attr,
+                                            self._extract(attr)))
+            for event, delta in (('INSERT', 1), ('UPDATE', 0),
+                                 ('DELETE', -1)):
+                conn.execute('CREATE TRIGGER IF NOT EXISTS "{0}_{1}" '
+                             'AFTER {1} ON "{0}" BEGIN UPDATE _meta SET '
+                             'count = count + {2}, version = version + 1 '
+                             'WHERE name = {3}; END'.format(
+                                 s_class, event, delta, name))
+            conn.execute('INSERT OR IGNORE INTO _meta SELECT ?, COUNT(*), 0 '
+                         'FROM "{}"'.format(s_class), (s_class,))
+            version = self._version(s_class)
+        with self._versions_lock:
+            self._versions.setdefault(s_class, version)
+        self._tables.add(s_class)
+
+    @staticmethod
+    def _extract(attr: str) -> str:
+        """ SQL expression of an attribute, written as a literal so that
+        it matches the expression indexes
+        """
+        return "json_extract(data, '$.{}')".format(attr.replace("'", "''"))
+
+    def _table(self, s_class: str) -> str:
+        """ Quoted table name of a class, creating the table if needed
+        """
+        if s_class not in self._tables:
+            self.register(s_class, ())
+        return '"{}"'.format(s_class)
+
+    @staticmethod
+    def _row(obj_json: dict) -> tuple:
+        """ Column values of a serialized object
+        """
+        return (obj_json['id'], obj_json.get('created_at'),
+                obj_json.get('updated_at'), json.dumps(obj_json))
+
+    def load(self, s_class: str) -> dict:
+        """ Return the serialized objects of a class, keyed by ID
+        """
+        return dict(self.iter_load(s_class))
+
+    def iter_load(self, s_class: str) -> Iterator[Tuple[str, dict]]:
+        """ Yield the (ID, serialized object) pairs of a class
+        """
+        cursor = self._connection().execute(
+            'SELECT id, data FROM {}'.format(self._table(s_class)))
+        for obj_id, data in cursor:
+            yield obj_id, json.loads(data)
+
+    def _version(self, s_class: str) -> int:
+        """ Write version of a class, bumped by every row change
+        """
+        return self._connection().execute(
+            'SELECT version FROM _meta WHERE name = ?',
+            (s_class,)).fetchone()[0]
+
+    def _track(self, s_class: str, before: int, after: int):
+        """ Remember the version written by this process, unless another
+        process wrote the class since changes() last looked
+        """
+        with self._versions_lock:
+            if self._versions.get(s_class) == before:
+                self._versions[s_class] = after
+
+    def dump(self, s_class: str, objs_json: dict):
+        """ Replace the stored objects of a class
+        """
+        table = self._table(s_class)
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            before = self._version(s_class)
+            conn.execute('DELETE FROM {}'.format(table))
+            conn.executemany('INSERT INTO {} VALUES (?, ?, ?, ?)'.format(
+                table), [self._row(o) for o in objs_json.values()])
+            after = self._version(s_class)
+        self._track(s_class, before, after)
+
+    def save(self, s_class: str, obj, objs: dict):
+        """ Insert or update an object
+        """
+        self.write_batch(s_class, [('save', obj)], objs)
+
+    def remove(self, s_class: str, obj, objs: dict):
+        """ Delete an object
+        """
+        self.write_batch(s_class, [('remove', obj)], objs)
+
+    def write_batch(self, s_class: str, ops: list, objs: dict):
+        """ Apply a list of ('save' | 'remove', obj) in one transaction
+        """
+        table = self._table(s_class)
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            before = self._version(s_class)
+            for op, obj in ops:
+                if op == 'save':
+                    conn.execute('INSERT INTO {} VALUES (?, ?, ?, ?) '
+                                 'ON CONFLICT (id) DO UPDATE SET '
+                                 'created_at = excluded.created_at, '
+                                 'updated_at = excluded.updated_at, '
+                                 'data = excluded.data'.format(table),
+                                 self._row(obj.to_json(True)))
+                else:
+                    conn.execute('DELETE FROM {} WHERE id = ?'.format(
+                        table), (obj.id,))
+            after = self._version(s_class)
+        self._track(s_class, before, after)
+
+    def changes(self, s_class: str) -> list:
+        """ Whether another process wrote a class since the last call
+
+        Queries always read the database, so there is nothing to apply:
+        returns an empty list when only this process wrote the class,
+        or None when objects cached from it may be stale.
+        """
+        self._table(s_class)
+        version = self._version(s_class)
+        with self._versions_lock:
+            known = self._versions.get(s_class)
+            self._versions[s_class] = version
+        return [] if version == known else None
+
+    def flush(self):
+        """ Nothing is buffered: every write is committed
+        """
+
+    def get(self, s_class: str, obj_id: str) -> dict:
+        """ Serialized object with the given ID, or None
+        """
+        row = self._connection().execute(
+            'SELECT data FROM {} WHERE id = ?'.format(self._table(s_class)),
+            (obj_id,)).fetchone()
+        return None if row is None else json.loads(row[0])
+
+    def search(self, s_class: str, attributes: dict) -> List[dict]:
+        """ Serialized objects whose attributes equal the given values
+        """
+        where = []
+        params = []
+        for k, v in attributes.items():
+            if k in COLUMNS:
+                where.append("{} IS ?".format(k))
+            else:
+                where.append(self._extract(k) + " IS ?")
+            if type(v) is datetime:
+                v = v.strftime(TIMESTAMP_FORMAT)
+            params.append(v)
+        query = 'SELECT data FROM {}'.format(self._table(s_class))
+        if where:
+            query += ' WHERE ' + ' AND '.join(where)
+        cursor = self._connection().execute(query, params)
+        return [json.loads(data) for data, in cursor]
+
+    @staticmethod
+    def _timestamp(value: float, round_up: bool = True) -> str:
+        """ Stored form of epoch seconds, rounded up to the second so that
+        range bounds keep their meaning against whole-second values, or
+        down for cursors, which name a stored value
+        """
+        value = math.ceil(value) if round_up else math.floor(value)
+        return time.strftime(TIMESTAMP_FORMAT, time.gmtime(value))
+
+    def search_range(self, s_class: str, attr: str, start: float = None,
+                     end: float = None, after: Tuple[float, str] = None,
+                     limit: int = None) -> List[dict]:
+        """ Serialized objects whose timestamp column `attr` is in
+        [start, end) and ordered after the (timestamp, ID) `after`,
+        oldest first
+        """
+        where = []
+        params = []
+        if start is not None:
+            where.append("{} >= ?".format(attr))
+            params.append(self._timestamp(start))
+        if end is not None:
+            where.append("{} < ?".format(attr))
+            params.append(self._timestamp(end))
+        if after is not None:
+            where.append("({}, id) > (?, ?)".format(attr))
+            params.extend((self._timestamp(after[0], False), after[1]))
+        query = 'SELECT data FROM {}'.format(self._table(s_class))
+        if where:
+            query += ' WHERE ' + ' AND '.join(where)
+        query += ' ORDER BY {}, id'.format(attr)
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+        cursor = self._connection().execute(query, params)
+        return [json.loads(data) for data, in cursor]
+
+    def count(self, s_class: str) -> int:
+        """ Number of stored objects of a class
+        """
+        self._table(s_class)
+        return self._connection().execute(
+            'SELECT count FROM _meta WHERE name = ?',
+            (s_class,)).fetchone()[0]
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+""" Readers-writer lock module
+"""
+import threading
+from contextlib import contextmanager
+
+
+class ReadWriteLock():
+    """ Lock shared by any number of readers or held by one writer
+
+    Waiting writers block new readers, so a steady stream of reads
+    cannot starve a write. The lock is not reentrant.
+    """
+
+    def __init__(self):
+        """ Initialize a ReadWriteLock
+        """
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        """ Hold the lock shared for the duration of a with block
+        """
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if self._readers == 0:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        """ Hold the lock exclusively for the duration of a with block
+        """
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+# Guards models.base.DATA and the indexes derived from it
+DATA_LOCK = ReadWriteLock()
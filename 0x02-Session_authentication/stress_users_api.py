@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+""" Multi-threaded stress run against the /api/v1/users endpoints
+
+Usage: python3 stress_users_api.py [threads] [requests_per_thread]
+
+Every thread creates, updates, reads, lists and deletes users through
+the Flask test client. The run fails on any 5xx response, and at the end
+the objects in memory must match what load_from_file() reads back, or
+with a queryable storage, the cached objects must match their rows.
+
+The storage files are written in a temporary working directory, which
+is removed with every user created once the run is over, so the
+project's own .db_*.json files are never touched.
+"""
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+
+# models and the app read and write their storage in the working
+# directory, starting at import time
+WORK_DIR = tempfile.mkdtemp(prefix="stress_users_api.")
+os.chdir(WORK_DIR)
+
+from api.v1.app import app  # noqa: E402
+from models.base import DATA  # noqa: E402
+from models.engine import storage  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def worker(n: int, requests: int, failures: list):
+    """ Issue a random mix of user requests
+    """
+    rnd = random.Random(n)
+    client = app.test_client()
+    mine = []
+    for i in range(requests):
+        r = rnd.random()
+        if r < 0.3 or not mine:
+            response = client.post('/api/v1/users', json={
+                'email': "stress{}-{}@hbtn.io".format(n, i),
+                'password': "pwd"})
+            if response.status_code == 201:
+                mine.append(response.get_json()['id'])
+        elif r < 0.5:
+            response = client.put('/api/v1/users/{}'.format(
+                rnd.choice(mine)), json={'first_name': str(i)})
+        elif r < 0.6:
+            response = client.delete('/api/v1/users/{}'.format(
+                mine.pop(rnd.randrange(len(mine)))))
+        elif r < 0.8:
+            response = client.get('/api/v1/users')
+        else:
+            response = client.get('/api/v1/users/{}'.format(
+                rnd.choice(mine)))
+        if response.status_code >= 500:
+            failures.append((response.status_code, response.get_data()))
+
+
+if __name__ == "__main__":
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    failures = []
+    workers = [threading.Thread(target=worker, args=(n, requests, failures))
+               for n in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+
+    User.flush()
+    in_memory = {k: v.to_json(True) for k, v in DATA['User'].items()}
+    if storage.queryable:
+        on_disk = {k: storage.get('User', k) for k in in_memory}
+    else:
+        User.load_from_file()
+        on_disk = {k: v.to_json(True) for k, v in DATA['User'].items()}
+    print("{} requests, {} server errors, storage consistent: {}".format(
+        threads * requests, len(failures), in_memory == on_disk))
+
+    User.remove_many(User.all())
+    User.flush()
+    print("{} users left after cleanup".format(User.count()))
+    os.chdir(os.path.dirname(WORK_DIR))
+    shutil.rmtree(WORK_DIR, ignore_errors=True)
+    sys.exit(1 if failures or in_memory != on_disk else 0)
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+""" Helpers to run model code in a fresh process and working directory
+"""
+import json
+import os
+import subprocess
+import sys
+import textwrap
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_script(script: str, cwd: str, **env: str):
+    """ Run a Python script with the project importable, in `cwd`, with
+    extra environment variables, and return the JSON it prints last
+
+    The storage engine is chosen when models is imported, so each
+    configuration needs its own process.
+    """
+    environ = dict(os.environ, PYTHONPATH=PROJECT_DIR, **env)
+    result = subprocess.run([sys.executable, '-c', textwrap.dedent(script)],
+                            cwd=cwd, env=environ, capture_output=True,
+                            text=True, timeout=120)
+    if result.returncode != 0:
+        raise AssertionError(result.stderr)
+    return json.loads(result.stdout.strip().splitlines()[-1])
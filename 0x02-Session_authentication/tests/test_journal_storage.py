@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+""" Journal storage shared by several processes
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+
+from tests.support import PROJECT_DIR, run_script
+
+WRITER = """
+import sys
+from models.user import User
+User.load_from_file()
+for i in range(300):
+    user = User(email="{}-{}@hbtn.io".format(sys.argv[1], i))
+    user.save()
+"""
+
+READER = """
+import json
+import time
+from models.user import User
+counts = []
+deadline = time.monotonic() + 60
+while time.monotonic() < deadline:
+    User.load_from_file()
+    counts.append(User.count())
+    if counts[-1] == 1200:
+        break
+print(json.dumps(counts))
+"""
+
+CHECK = """
+import json
+from models.user import User
+User.load_from_file()
+print(json.dumps({'count': User.count(),
+                  'emails': len(set(u.email for u in User.all()))}))
+"""
+
+
+class TestJournalProcesses(unittest.TestCase):
+    """ Writers rotating and compacting one journal lose no record
+    """
+
+    def test_concurrent_writers(self):
+        """ 4 writers and a reader with a journal rotated every 4000 bytes
+        """
+        env = dict(os.environ, PYTHONPATH=PROJECT_DIR,
+                   MODEL_STORAGE='journal', MODEL_JOURNAL_MAX_BYTES='4000')
+        with tempfile.TemporaryDirectory() as cwd:
+            processes = [subprocess.Popen(
+                [sys.executable, '-c', textwrap.dedent(WRITER), str(n)],
+                cwd=cwd, env=env, stderr=subprocess.PIPE, text=True)
+                for n in range(4)]
+            reader = subprocess.Popen(
+                [sys.executable, '-c', textwrap.dedent(READER)],
+                cwd=cwd, env=env, stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE, text=True)
+            for process in processes:
+                _, err = process.communicate(timeout=120)
+                self.assertEqual(process.returncode, 0, err)
+            out, err = reader.communicate(timeout=120)
+            self.assertEqual(reader.returncode, 0, err)
+            result = run_script(CHECK, cwd, MODEL_STORAGE='journal')
+            leftovers = [name for name in os.listdir(cwd)
+                         if name.endswith('.tmp')]
+        counts = json.loads(out)
+        self.assertEqual(result, {'count': 1200, 'emails': 1200})
+        self.assertEqual(leftovers, [])
+        self.assertEqual(counts, sorted(counts))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+""" Keyset pagination of Base across processes and storage engines
+"""
+import tempfile
+import unittest
+
+from tests.support import run_script
+
+CREATE = """
+import json
+from models.user import User
+User.load_from_file()
+ids = []
+for i in range(6):
+    user = User(email="user{}@hbtn.io".format(i))
+    user.save()
+    ids.append(user.id)
+User.flush()
+page, cursor = User.paginate(2)
+print(json.dumps({'ids': ids, 'page': [u.id for u in page],
+                  'cursor': cursor}))
+"""
+
+PAGE_ALL = """
+import json, sys
+from models.user import User
+User.load_from_file()
+seen, cursor = [], {cursor!r}
+while True:
+    page, cursor = User.paginate(2, cursor)
+    seen.extend(u.id for u in page)
+    if cursor is None:
+        break
+print(json.dumps(seen))
+"""
+
+CREATE_AND_PAGE = """
+import json
+from models.user import User
+ids = []
+for i in range(6):
+    user = User(email="user{}@hbtn.io".format(i))
+    user.save()
+    ids.append(user.id)
+seen, cursor = [], None
+while True:
+    page, cursor = User.paginate(2, cursor)
+    seen.extend(u.id for u in page)
+    if cursor is None:
+        break
+print(json.dumps({'ids': ids, 'seen': seen}))
+"""
+
+
+class TestPagination(unittest.TestCase):
+    """ Pages must cover every object exactly once
+    """
+
+    def check_pages(self, **env):
+        """ Page through objects created in the same second, the first
+        page in the creating process and the rest in another one
+        """
+        with tempfile.TemporaryDirectory() as cwd:
+            created = run_script(CREATE, cwd, **env)
+            self.assertEqual(len(created['page']), 2)
+            self.assertIsNotNone(created['cursor'])
+            rest = run_script(PAGE_ALL.format(cursor=created['cursor']),
+                              cwd, **env)
+            self.assertEqual(sorted(created['page'] + rest),
+                             sorted(created['ids']))
+
+    def test_file_storage(self):
+        """ JSON file storage
+        """
+        self.check_pages()
+
+    def test_journal_storage(self):
+        """ Journal storage
+        """
+        self.check_pages(MODEL_STORAGE='journal')
+
+    def test_sqlite_storage(self):
+        """ SQLite storage, whose cached objects are reused by queries
+        """
+        self.check_pages(MODEL_STORAGE='sqlite')
+
+    def test_sqlite_pages_in_creating_process(self):
+        """ SQLite storage, every page served by the process whose object
+        cache holds the new objects
+        """
+        with tempfile.TemporaryDirectory() as cwd:
+            result = run_script(CREATE_AND_PAGE, cwd, MODEL_STORAGE='sqlite')
+            self.assertEqual(sorted(result['seen']), sorted(result['ids']))
+
+    def test_cursor_from_other_process_is_whole_seconds(self):
+        """ Cursors carry the stored, whole-second timestamp
+        """
+        with tempfile.TemporaryDirectory() as cwd:
+            created = run_script(CREATE, cwd)
+            stamp = created['cursor'].split(',')[0]
+            self.assertEqual(stamp, str(int(stamp)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+""" Indexed search of Base and unsaved changes
+"""
+import tempfile
+import unittest
+
+from tests.support import run_script
+
+SEARCH = """
+import json
+from models.user import User
+User.load_from_file()
+user = User(email="old@hbtn.io")
+user.save()
+user.email = "new@hbtn.io"
+before = [len(User.search({'email': "old@hbtn.io"})),
+          len(User.search({'email': "new@hbtn.io"}))]
+user.save()
+after = [len(User.search({'email': "old@hbtn.io"})),
+         len(User.search({'email': "new@hbtn.io"}))]
+copy = User.from_json(user.to_json(True))
+copy.email = "copy@hbtn.io"
+found = [u.id for u in User.search({'email': "new@hbtn.io"})]
+print(json.dumps({'before': before, 'after': after,
+                  'copy': len(User.search({'email': "copy@hbtn.io"})),
+                  'found': found == [user.id]}))
+"""
+
+
+class TestIndexedSearch(unittest.TestCase):
+    """ Index lookups follow assignments of indexed attributes
+    """
+
+    def check_search(self, **env):
+        """ An unsaved change is found by its new value only
+        """
+        with tempfile.TemporaryDirectory() as cwd:
+            result = run_script(SEARCH, cwd, **env)
+        self.assertEqual(result['before'], [0, 1])
+        self.assertEqual(result['after'], [0, 1])
+        self.assertEqual(result['copy'], 0)
+        self.assertTrue(result['found'])
+
+    def test_file_storage(self):
+        """ JSON file storage
+        """
+        self.check_search()
+
+    def test_journal_storage(self):
+        """ Journal storage
+        """
+        self.check_search(MODEL_STORAGE='journal')
+
+
+if __name__ == '__main__':
+    unittest.main()
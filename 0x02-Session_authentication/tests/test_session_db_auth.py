@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+""" Session sweeping of SessionDBAuth
+"""
+import tempfile
+import unittest
+
+from tests.support import run_script
+
+SWEEP = """
+import json
+from datetime import datetime, timedelta
+from models.engine import storage
+from models.user_session import UserSession
+from api.v1.auth.session_db_auth import SessionDBAuth
+
+UserSession.load_from_file()
+old = datetime.utcnow() - timedelta(hours=1)
+for i in range(200):
+    user_session = UserSession(user_id='u', session_id='s{}'.format(i))
+    if i < 150:
+        user_session.created_at = old
+    user_session.save()
+
+writes = []
+write_batch = storage.write_batch
+def counting_write_batch(s_class, ops, objs):
+    writes.append(len(ops))
+    return write_batch(s_class, ops, objs)
+storage.write_batch = counting_write_batch
+
+auth = SessionDBAuth()
+session_id = auth.create_session('u')
+UserSession.load_from_file()
+print(json.dumps({'writes': writes, 'count': UserSession.count(),
+                  'user_id': auth.user_id_for_session_id(session_id)}))
+"""
+
+
+class TestSweepSessions(unittest.TestCase):
+    """ Expired sessions are removed in one batch on login
+    """
+
+    def check_sweep(self, **env):
+        """ 150 expired and 50 live sessions, then one login
+        """
+        with tempfile.TemporaryDirectory() as cwd:
+            result = run_script(SWEEP, cwd, SESSION_DURATION='60', **env)
+        self.assertEqual(sorted(result['writes']), [1, 100])
+        self.assertEqual(result['count'], 200 - 100 + 1)
+        self.assertEqual(result['user_id'], 'u')
+
+    def test_file_storage(self):
+        """ JSON file storage
+        """
+        self.check_sweep()
+
+    def test_journal_storage(self):
+        """ Journal storage
+        """
+        self.check_sweep(MODEL_STORAGE='journal')
+
+    def test_sqlite_storage(self):
+        """ SQLite storage
+        """
+        self.check_sweep(MODEL_STORAGE='sqlite')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+""" Failure handling of the write-behind storage
+"""
+import logging
+import tempfile
+import time
+import unittest
+from types import SimpleNamespace
+
+from models.engine.write_behind_storage import WriteBehindStorage
+from tests.support import run_script
+
+
+class FlakyStorage():
+    """ Storage whose first `failures` writes raise OSError
+    """
+
+    def __init__(self, failures: int):
+        """ Initialize a FlakyStorage
+        """
+        self.failures = failures
+        self.batches = []
+        self.changed = []
+
+    def write_batch(self, s_class: str, ops: list, objs: dict):
+        """ Record a batch, or fail
+        """
+        if self.failures > 0:
+            self.failures -= 1
+            raise OSError("disk full")
+        self.batches.append((s_class, [(op, obj.id) for op, obj in ops]))
+
+    def changes(self, s_class: str):
+        """ The changes set by the test
+        """
+        return self.changed
+
+
+class TestWriteBehindFailures(unittest.TestCase):
+    """ A failed flush must neither lose mutations nor stop the flusher
+    """
+
+    def storage(self, failures: int, interval: float = 3600):
+        """ A WriteBehindStorage around a FlakyStorage
+        """
+        return WriteBehindStorage(FlakyStorage(failures), interval=interval,
+                                  threshold=1000)
+
+    def test_failed_batch_is_pending_again(self):
+        """ The mutations of a failed flush are written by the next one
+        """
+        storage = self.storage(1)
+        storage.save('User', SimpleNamespace(id='a'), {})
+        storage.remove('User', SimpleNamespace(id='b'), {})
+        with self.assertRaises(OSError):
+            storage.flush()
+        storage.flush()
+        self.assertEqual(storage.storage.batches,
+                         [('User', [('save', 'a'), ('remove', 'b')])])
+
+    def test_newer_mutation_wins_over_failed_one(self):
+        """ A mutation made after the failure replaces the failed one
+        """
+        storage = self.storage(1)
+        storage.save('User', SimpleNamespace(id='a'), {})
+        with self.assertRaises(OSError):
+            storage.flush()
+        storage.remove('User', SimpleNamespace(id='a'), {})
+        storage.flush()
+        self.assertEqual(storage.storage.batches,
+                         [('User', [('remove', 'a')])])
+
+    def test_classes_not_written_are_pending_again(self):
+        """ A failure keeps the classes the flush did not reach
+        """
+        storage = self.storage(1)
+        storage.save('User', SimpleNamespace(id='a'), {})
+        storage.save('UserSession', SimpleNamespace(id='s'), {})
+        with self.assertRaises(OSError):
+            storage.flush()
+        storage.flush()
+        self.assertEqual(sorted(storage.storage.batches),
+                         [('User', [('save', 'a')]),
+                          ('UserSession', [('save', 's')])])
+
+    def test_flusher_survives_failure(self):
+        """ The background thread logs the error and retries
+        """
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        storage = self.storage(2, interval=0.01)
+        storage.save('User', SimpleNamespace(id='a'), {})
+        deadline = time.time() + 5
+        while not storage.storage.batches and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertTrue(storage._flusher.is_alive())
+        self.assertEqual(storage.storage.batches, [('User', [('save', 'a')])])
+
+
+class TestWriteBehindChanges(unittest.TestCase):
+    """ changes() only flushes before a full reload
+    """
+
+    def setUp(self):
+        """ A WriteBehindStorage with one pending save
+        """
+        self.storage = WriteBehindStorage(FlakyStorage(0), interval=3600,
+                                          threshold=1000)
+        self.storage.save('User', SimpleNamespace(id='a'), {})
+
+    def test_no_flush_when_changes_are_known(self):
+        """ Pending writes stay buffered
+        """
+        self.assertEqual(self.storage.changes('User'), [])
+        self.assertEqual(self.storage.storage.batches, [])
+
+    def test_flush_before_full_reload(self):
+        """ Pending writes are flushed when the class is loaded again
+        """
+        self.storage.storage.changed = None
+        self.assertIsNone(self.storage.changes('User'))
+        self.assertEqual(self.storage.storage.batches,
+                         [('User', [('save', 'a')])])
+
+    def test_pending_objects_are_left_out(self):
+        """ A pending write wins over a change from another process
+        """
+        self.storage.storage.changed = [('a', {'id': 'a'}),
+                                        ('b', {'id': 'b'})]
+        self.assertEqual(self.storage.changes('User'), [('b', {'id': 'b'})])
+
+
+SAVE_WITH_FAILURE = """
+import json, time
+from models.engine import storage
+from models.user import User
+User.load_from_file()
+inner = storage.storage
+append, failures = inner._append, [1]
+def flaky_append(*args):
+    if failures:
+        failures.pop()
+        raise OSError("disk full")
+    return append(*args)
+inner._append = flaky_append
+user = User(email="kept@hbtn.io")
+user.save()
+time.sleep(0.5)
+alive = storage._flusher.is_alive()
+User.flush()
+print(json.dumps({'id': user.id, 'alive': alive, 'failures': failures}))
+"""
+
+LOAD = """
+import json
+from models.user import User
+User.load_from_file()
+print(json.dumps(sorted(u.id for u in User.all())))
+"""
+
+
+class TestWriteBehindJournal(unittest.TestCase):
+    """ End to end, over the journal storage
+    """
+
+    def test_acknowledged_save_survives_failed_flush(self):
+        """ A save whose first flush failed is on disk after reload
+        """
+        env = {'MODEL_STORAGE': 'journal', 'MODEL_WRITE_BEHIND': '1',
+               'MODEL_FLUSH_INTERVAL': '0.05'}
+        with tempfile.TemporaryDirectory() as cwd:
+            saved = run_script(SAVE_WITH_FAILURE, cwd, **env)
+            self.assertTrue(saved['alive'])
+            self.assertEqual(saved['failures'], [])
+            self.assertEqual(run_script(LOAD, cwd, **env), [saved['id']])
+
+
+if __name__ == '__main__':
+    unittest.main()